@@ -18,9 +18,17 @@ const getAuthHeaders = () => {
 
 const api = {
   getDatasets: async () => {
-    const res = await fetch(`${BASE_URL}/dataset/`, { headers: getAuthHeaders() });
-    if (!res.ok) throw new Error('Failed to load datasets.');
-    return res.json();
+    // The list is paged server-side; walk every page so search sees all datasets
+    const datasets: any[] = [];
+    for (let page = 1; ; page++) {
+      const res = await fetch(`${BASE_URL}/dataset/?page=${page}&limit=100`, { headers: getAuthHeaders() });
+      if (!res.ok) throw new Error('Failed to load datasets.');
+      const data = await res.json();
+      const items = data.datasets || [];
+      datasets.push(...items);
+      if (!items.length || datasets.length >= (data.total ?? 0)) break;
+    }
+    return { datasets };
   }
 };
 
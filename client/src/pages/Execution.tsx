@@ -734,8 +734,15 @@ const getErrorMessage = (error: any, fallback: string) => {
 // --- STRICT API SERVICES ---
 const api = {
   getTemplates: async () => {
-    const res = await axios.get(`${BASE_URL}/campaign-template`, getAuthHeaders());
-    return res.data;
+    // The list is paged server-side; walk every page
+    const templates: any[] = [];
+    for (let page = 1; ; page++) {
+      const res = await axios.get(`${BASE_URL}/campaign-template?page=${page}&limit=100`, getAuthHeaders());
+      const items = res.data.templates || [];
+      templates.push(...items);
+      if (!items.length || templates.length >= (res.data.total ?? 0)) break;
+    }
+    return { templates };
   },
   previewCsv: async (file: File) => {
     const formData = new FormData();
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { 
   ArrowLeft, CheckCircle, AlertCircle, RefreshCw, XCircle, Slash, StopCircle,
@@ -17,6 +17,8 @@ export default function ExecutionDetail() {
   const [logs, setLogs] = useState<any[]>([]);
   const [page, setPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  // cursors.current[n - 1] → cursor that loads page n (page 1 needs none)
+  const cursors = useRef<(string | null)[]>([null]);
   const [isLoading, setIsLoading] = useState(true);
   const [isLogsLoading, setIsLogsLoading] = useState(false);
   const [isCancelling, setIsCancelling] = useState(false);
@@ -35,8 +37,11 @@ export default function ExecutionDetail() {
   const loadLogs = async (pageNum = 1) => {
     setIsLogsLoading(true);
     try {
-      const res = await axios.get(`${BASE_URL}/execution/${id}/logs?page=${pageNum}&limit=50`, getAuthHeaders());
+      const cursor = cursors.current[pageNum - 1];
+      const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const res = await axios.get(`${BASE_URL}/execution/${id}/logs?limit=50${query}`, getAuthHeaders());
       setLogs(res.data.logs || res.data.items || []);
+      cursors.current[pageNum] = res.data.next_cursor || null;
       const totalLogs = res.data.total_logs || 0;
       setTotalPages(Math.ceil(totalLogs / 50) || 1);
       setPage(pageNum);
@@ -209,7 +214,7 @@ export default function ExecutionDetail() {
             <p className="text-xs text-[#6B7280] font-bold">Page {page} of {totalPages}</p>
             <div className="flex items-center gap-2">
               <button disabled={page === 1} onClick={() => loadLogs(page - 1)} className="p-1.5 bg-white border border-[#E5E7EB] rounded hover:bg-[#F9FAFB] disabled:opacity-50"><ChevronLeft size={16}/></button>
-              <button disabled={page === totalPages} onClick={() => loadLogs(page + 1)} className="p-1.5 bg-white border border-[#E5E7EB] rounded hover:bg-[#F9FAFB] disabled:opacity-50"><ChevronRight size={16}/></button>
+              <button disabled={page === totalPages || !cursors.current[page]} onClick={() => loadLogs(page + 1)} className="p-1.5 bg-white border border-[#E5E7EB] rounded hover:bg-[#F9FAFB] disabled:opacity-50"><ChevronRight size={16}/></button>
             </div>
           </div>
         </div>
@@ -32,8 +32,16 @@ export default function ExecutionHistory() {
   const fetchExecutions = async () => {
     setIsLoading(true);
     try {
-      const res = await axios.get(`${BASE_URL}/execution/`, getAuthHeaders());
-      setExecutions(res.data.executions || res.data.items || res.data || []);
+      // The list is cursor-paged server-side; follow next_cursor to the end
+      const all: Execution[] = [];
+      let cursor: string | null = null;
+      do {
+        const query: string = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+        const res = await axios.get(`${BASE_URL}/execution/?limit=200${query}`, getAuthHeaders());
+        all.push(...(res.data.executions || []));
+        cursor = res.data.next_cursor || null;
+      } while (cursor);
+      setExecutions(all);
     } catch (error) {
       console.error("Failed to load execution history.");
     } finally {
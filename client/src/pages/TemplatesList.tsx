@@ -31,9 +31,15 @@ export default function TemplatesList() {
   const fetchTemplates = async () => {
     setIsLoading(true);
     try {
-      const res = await axios.get(`${BASE_URL}/campaign-template`, getAuthHeaders());
-      // Handle various backend wrapper formats
-      setTemplates(res.data.templates || res.data.items || res.data || []);
+      // The list is paged server-side; walk every page
+      const all: any[] = [];
+      for (let page = 1; ; page++) {
+        const res = await axios.get(`${BASE_URL}/campaign-template?page=${page}&limit=100`, getAuthHeaders());
+        const items = res.data.templates || [];
+        all.push(...items);
+        if (!items.length || all.length >= (res.data.total ?? 0)) break;
+      }
+      setTemplates(all);
     } catch (error) {
       console.error("Failed to load templates", error);
     } finally {
@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func
 from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models.db_models import (
     CampaignExecution,
-    ExecutionLog
+    AnalyticsDailyRollup
 )
 from app.core.dependencies import get_current_user
+from app.core.analytics_summary import get_org_stats
+from app.core.response_cache import cached_response
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -18,74 +20,37 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 # =====================================================
 
 @router.get("/summary")
+@cached_response
 def get_org_summary(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
 
-    org_id = current_user.organization_id
-
-    total_executions = db.query(func.count(CampaignExecution.id)).filter(
-        CampaignExecution.organization_id == org_id
-    ).scalar()
-
-    total_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id
-    ).scalar()
-
-    success_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.delivery_status == "delivered"
-    ).scalar()
+    # One aggregate query, shared with the dashboard (short TTL)
+    stats = get_org_stats(db, current_user.organization_id)
 
-    failed_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.delivery_status == "failed"
-    ).scalar()
-
-    retry_count = db.query(func.sum(ExecutionLog.retry_count)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id
-    ).scalar()
-
-    completed_executions = db.query(func.count(CampaignExecution.id)).filter(
-        CampaignExecution.organization_id == org_id,
-        CampaignExecution.status == "completed"
-    ).scalar()
+    total_executions = stats["total_executions"]
+    total_messages = stats["total_messages"]
 
     completion_rate = (
-        (completed_executions / total_executions) * 100
+        (stats["completed_executions"] / total_executions) * 100
         if total_executions else 0
     )
 
     success_rate = (
-        (success_messages / total_messages) * 100
+        (stats["success_messages"] / total_messages) * 100
         if total_messages else 0
     )
 
-    avg_duration = db.query(
-        func.avg(CampaignExecution.execution_duration_seconds)
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        CampaignExecution.status == "completed"
-    ).scalar()
-
     return {
-        "total_executions": total_executions or 0,
-        "total_messages": total_messages or 0,
-        "success_messages": success_messages or 0,
-        "failed_messages": failed_messages or 0,
+        "total_executions": total_executions,
+        "total_messages": total_messages,
+        "success_messages": stats["success_messages"],
+        "failed_messages": stats["failed_messages"],
         "success_rate_percent": round(success_rate, 2),
         "completion_rate_percent": round(completion_rate, 2),
-        "total_retries": retry_count or 0,
-        "average_execution_duration_seconds": round(avg_duration or 0, 2)
+        "total_retries": stats["total_retries"],
+        "average_execution_duration_seconds": round(stats["avg_duration"], 2)
     }
 
 
@@ -94,6 +59,7 @@ def get_org_summary(
 # =====================================================
 
 @router.get("/daily-trend")
+@cached_response(daily=True)
 def get_daily_trend(
     days: int = Query(7, ge=1, le=90),
     db: Session = Depends(get_db),
@@ -101,24 +67,19 @@ def get_daily_trend(
 ):
 
     org_id = current_user.organization_id
-    start_date = datetime.utcnow() - timedelta(days=days)
+    start_date = (datetime.utcnow() - timedelta(days=days)).date()
 
     results = db.query(
-        func.date(ExecutionLog.created_at).label("date"),
-        func.count(ExecutionLog.id).label("total"),
-        func.sum(
-            case(
-                (ExecutionLog.delivery_status == "delivered", 1),
-                else_=0
-            )
-        ).label("success")
-    ).join(
-        CampaignExecution
+        AnalyticsDailyRollup.day.label("date"),
+        func.sum(AnalyticsDailyRollup.total_count).label("total"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success")
     ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.created_at >= start_date
+        AnalyticsDailyRollup.organization_id == org_id,
+        AnalyticsDailyRollup.day >= start_date
     ).group_by(
-        func.date(ExecutionLog.created_at)
+        AnalyticsDailyRollup.day
+    ).order_by(
+        AnalyticsDailyRollup.day
     ).all()
 
     return {
@@ -142,6 +103,7 @@ def get_daily_trend(
 # =====================================================
 
 @router.get("/channel-performance")
+@cached_response
 def get_channel_performance(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -150,20 +112,13 @@ def get_channel_performance(
     org_id = current_user.organization_id
 
     results = db.query(
-        ExecutionLog.channel_type,
-        func.count(ExecutionLog.id).label("total"),
-        func.sum(
-            case(
-                (ExecutionLog.delivery_status == "delivered", 1),
-                else_=0
-            )
-        ).label("success")
-    ).join(
-        CampaignExecution
+        AnalyticsDailyRollup.channel_type,
+        func.sum(AnalyticsDailyRollup.total_count).label("total"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success")
     ).filter(
-        CampaignExecution.organization_id == org_id
+        AnalyticsDailyRollup.organization_id == org_id
     ).group_by(
-        ExecutionLog.channel_type
+        AnalyticsDailyRollup.channel_type
     ).all()
 
     return {
@@ -186,6 +141,7 @@ def get_channel_performance(
 # =====================================================
 
 @router.get("/throughput")
+@cached_response
 def get_throughput(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
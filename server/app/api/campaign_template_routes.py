@@ -1,12 +1,11 @@
 # app/api/campaign_template_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func
 from datetime import datetime
 import uuid
 import re
-import pandas as pd
 import json
 
 from app.database import get_db
@@ -14,10 +13,18 @@ from app.models.db_models import CampaignTemplate, Dataset
 from app.core.dependencies import CurrentUser, get_current_user
 from app.core.filter_engine import (
     validate_filter_dsl,
+    compile_filter,
     FilterValidationError,
-    apply_filter,
+    is_group,
 )
+from app.core.filter_cache import apply_filter_cached, filter_mask
+from app.core.bitmap_index import load_bitmap_index
+from app.core.audience_estimate import estimate_audience
+from app.core.response_cache import bump_analytics_version
+from app.core.dataset_store import read_dataset_frame, DatasetStoreError
 from app.core.template_engine import render_template
+from app.core.csv_engine import read_csv_frame, CSVParseError
+from app.core.schema_engine import infer_schema, schema_cache, file_checksum
 
 
 router = APIRouter(prefix="/campaign-template", tags=["Campaign Template"])
@@ -34,23 +41,41 @@ def extract_variables(template: str):
     return [v.strip().lower() for v in raw_vars]
 
 
+def normalize_filter_node(node):
+    if not isinstance(node, dict):
+        return node
+
+    if "not" in node:
+        return {"not": normalize_filter_node(node["not"])}
+
+    if is_group(node):
+        return {
+            "logic": node.get("logic", "AND"),
+            "conditions": [
+                normalize_filter_node(child)
+                for child in node.get("conditions") or []
+            ]
+        }
+
+    return {
+        "column": (node.get("column") or "").strip().lower(),
+        "operator": node.get("operator"),
+        "value": node.get("value")
+    }
+
+
 def normalize_filter_dsl(filter_dsl: dict):
     if not filter_dsl:
         return None
 
-    normalized_conditions = []
-
-    for cond in filter_dsl.get("conditions", []):
-        normalized_conditions.append({
-            "column": cond.get("column", "").strip().lower(),
-            "operator": cond.get("operator"),
-            "value": cond.get("value")
-        })
+    if "not" in filter_dsl:
+        return normalize_filter_node(filter_dsl)
 
-    return {
+    # Top level is always a group (logic defaults to AND)
+    return normalize_filter_node({
         "logic": filter_dsl.get("logic", "AND"),
-        "conditions": normalized_conditions
-    }
+        "conditions": filter_dsl.get("conditions", [])
+    })
 
 
 
@@ -118,6 +143,8 @@ def create_campaign_template(
     db.commit()
     db.refresh(template)
 
+    bump_analytics_version(current_user.organization_id)
+
     return {
         "success": True,
         "logical_id": logical_id,
@@ -133,36 +160,64 @@ def create_campaign_template(
 
 @router.get("/")
 def list_latest_templates(
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    subquery = (
-        db.query(
-            CampaignTemplate.logical_id,
-            func.max(CampaignTemplate.version).label("max_version")
-        )
+    """
+    Latest non-deleted version of each template with its dataset
+    schema, in one round trip: DISTINCT ON (logical_id) over
+    idx_template_org_logical_version, joined to datasets. Paged by
+    `page`/`limit` (50 per page by default).
+    """
+
+    latest = (
+        db.query(CampaignTemplate.id)
         .filter(
             CampaignTemplate.organization_id == current_user.organization_id,
             CampaignTemplate.is_deleted == False
         )
-        .group_by(CampaignTemplate.logical_id)
+        .distinct(CampaignTemplate.logical_id)
+        .order_by(CampaignTemplate.logical_id, CampaignTemplate.version.desc())
         .subquery()
     )
 
-    templates = (
-        db.query(CampaignTemplate)
-        .join(
-            subquery,
-            and_(
-                CampaignTemplate.logical_id == subquery.c.logical_id,
-                CampaignTemplate.version == subquery.c.max_version
-            )
+    query = (
+        db.query(
+            CampaignTemplate.logical_id,
+            CampaignTemplate.version,
+            CampaignTemplate.name,
+            CampaignTemplate.description,
+            CampaignTemplate.status,
+            CampaignTemplate.variables,
+            CampaignTemplate.filter_dsl,
+            CampaignTemplate.dataset_id,
+            CampaignTemplate.updated_at,
+            Dataset.schema.label("dataset_schema"),
+            func.count().over().label("total")
         )
-        .all()
+        .join(latest, latest.c.id == CampaignTemplate.id)
+        .outerjoin(Dataset, Dataset.id == CampaignTemplate.dataset_id)
+        .order_by(CampaignTemplate.updated_at.desc(), CampaignTemplate.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
     )
 
+    templates = query.all()
+
+    if templates:
+        total = templates[0].total
+    elif page > 1:
+        # Past the last page — the window count has no row to ride on
+        total = db.query(func.count()).select_from(latest).scalar()
+    else:
+        total = 0
+
     return {
-        "total": len(templates),
+        "total": total,
+        "page": page,
+        "limit": limit,
         "templates": [
             {
                 "logical_id": t.logical_id,
@@ -173,7 +228,7 @@ def list_latest_templates(
                 "variables": t.variables or [],
                 "filter_dsl": t.filter_dsl,
                 "dataset_id": t.dataset_id,
-                "dataset_schema": t.dataset.schema if t.dataset else None,
+                "dataset_schema": t.dataset_schema,
                 "updated_at": t.updated_at
             }
             for t in templates
@@ -276,6 +331,8 @@ def update_template(
     db.add(new_template)
     db.commit()
 
+    bump_analytics_version(current_user.organization_id)
+
     return {
         "success": True,
         "logical_id": logical_id,
@@ -343,6 +400,8 @@ def delete_template(
 
     db.commit()
 
+    bump_analytics_version(current_user.organization_id)
+
     return {"success": True}
 
 
@@ -382,6 +441,78 @@ def preview_template(
     return {"rendered_message": rendered}
 
 
+# =====================================================
+# ESTIMATE AUDIENCE (STORED DATASET, NO UPLOAD)
+# =====================================================
+
+@router.post("/estimate-audience")
+def estimate_audience_size(
+    payload: dict,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Audience size for a filter over a stored dataset, answered from
+    its schema stats and bitmap index (no file read). `exact: true`
+    falls back to scanning only the filter columns when the index
+    cannot answer the whole filter.
+    """
+
+    dataset = db.query(Dataset).filter(
+        Dataset.id == payload.get("dataset_id"),
+        Dataset.organization_id == current_user.organization_id
+    ).first()
+
+    if not dataset:
+        raise HTTPException(404, "Dataset not found")
+
+    if not dataset.schema:
+        raise HTTPException(400, "Dataset has no schema")
+
+    filter_definition = payload.get("filter_definition")
+
+    if isinstance(filter_definition, str):
+        try:
+            filter_definition = json.loads(filter_definition)
+        except ValueError:
+            raise HTTPException(400, "Invalid filter JSON")
+
+    normalized_filter = (
+        normalize_filter_dsl(filter_definition) if filter_definition else None
+    )
+
+    try:
+        plan = compile_filter(normalized_filter, dataset.schema)
+    except FilterValidationError as e:
+        raise HTTPException(400, str(e))
+
+    index = load_bitmap_index(dataset.storage_path)
+    estimate = estimate_audience(plan, dataset.row_count or 0, index)
+
+    if payload.get("exact") and not estimate["exact"]:
+        try:
+            df = read_dataset_frame(dataset.storage_path, columns=plan.columns)
+        except DatasetStoreError:
+            raise HTTPException(404, "Dataset file not found")
+
+        mask = filter_mask(
+            df,
+            normalized_filter,
+            dataset.schema,
+            dataset.checksum,
+            index
+        )
+
+        estimate.update({
+            "row_count": len(df),
+            "matched_count": int(mask.sum()),
+            "exact": True,
+            "method": "scan",
+        })
+
+    return estimate
+
+
 # =====================================================
 # TEST FILTER (STATELESS)
 # =====================================================
@@ -396,17 +527,13 @@ async def test_filter(
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "Only CSV files allowed")
 
-    df = pd.read_csv(file.file, dtype=str)
-
-    df.columns = df.columns.str.strip().str.lower()
-
-    schema = []
+    try:
+        checksum = file_checksum(file.file)
+        df = read_csv_frame(file.file)
+    except (CSVParseError, OSError):
+        raise HTTPException(400, "Invalid CSV file")
 
-    for col in df.columns:
-        if pd.to_numeric(df[col], errors="coerce").notna().all():
-            schema.append({"name": col, "type": "number"})
-        else:
-            schema.append({"name": col, "type": "string"})
+    schema = schema_cache.get_or_infer(checksum, lambda: infer_schema(df))
 
     if not filter_definition:
         return {
@@ -423,7 +550,7 @@ async def test_filter(
     normalized_filter = normalize_filter_dsl(filter_definition)
 
     try:
-        filtered_df = apply_filter(df, normalized_filter, schema)
+        filtered_df = apply_filter_cached(df, normalized_filter, schema, checksum)
     except FilterValidationError as e:
         raise HTTPException(400, str(e))
 
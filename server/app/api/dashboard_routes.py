@@ -1,18 +1,18 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func
 from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models.db_models import (
     CampaignTemplate,
     CampaignExecution,
-    ExecutionLog,
     ChannelIntegration,
-    Organization,
-    Dataset
+    AnalyticsDailyRollup
 )
 from app.core.dependencies import get_current_user
+from app.core.analytics_summary import get_org_stats
+from app.core.response_cache import cached_response
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -23,71 +23,31 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 # =====================================================
 
 @router.get("/overview")
+@cached_response
 def dashboard_overview(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    org_id = current_user.organization_id
-
-    organization = db.query(Organization).filter(
-        Organization.id == org_id
-    ).first()
-
-    total_templates = db.query(func.count(CampaignTemplate.id)).filter(
-        CampaignTemplate.organization_id == org_id,
-        CampaignTemplate.is_deleted == False
-    ).scalar()
-
-    total_datasets = db.query(func.count(Dataset.id)).filter(
-        Dataset.organization_id == org_id
-    ).scalar()
-
-    total_executions = db.query(func.count(CampaignExecution.id)).filter(
-        CampaignExecution.organization_id == org_id
-    ).scalar()
+    # One aggregate query, shared with /analytics/summary (short TTL)
+    stats = get_org_stats(db, current_user.organization_id)
 
-    total_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id
-    ).scalar()
-
-    success_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.delivery_status == "delivered"
-    ).scalar()
-
-    failed_messages = db.query(func.count(ExecutionLog.id)).join(
-        CampaignExecution
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.delivery_status == "failed"
-    ).scalar()
+    total_messages = stats["total_messages"]
 
     success_rate = (
-        (success_messages / total_messages) * 100
+        (stats["success_messages"] / total_messages) * 100
         if total_messages else 0
     )
 
-    avg_duration = db.query(
-        func.avg(CampaignExecution.execution_duration_seconds)
-    ).filter(
-        CampaignExecution.organization_id == org_id,
-        CampaignExecution.status == "completed"
-    ).scalar()
-
     return {
-        "organization_name": organization.name if organization else "",
-        "total_templates": total_templates or 0,
-        "total_datasets": total_datasets or 0,
-        "total_executions": total_executions or 0,
-        "total_messages": total_messages or 0,
-        "success_messages": success_messages or 0,
-        "failed_messages": failed_messages or 0,
+        "organization_name": stats["organization_name"] or "",
+        "total_templates": stats["total_templates"],
+        "total_datasets": stats["total_datasets"],
+        "total_executions": stats["total_executions"],
+        "total_messages": total_messages,
+        "success_messages": stats["success_messages"],
+        "failed_messages": stats["failed_messages"],
         "success_rate_percent": round(success_rate, 2),
-        "average_execution_duration_seconds": round(avg_duration or 0, 2)
+        "average_execution_duration_seconds": round(stats["avg_duration"], 2)
     }
 
 
@@ -96,6 +56,7 @@ def dashboard_overview(
 # =====================================================
 
 @router.get("/executions/trend")
+@cached_response(daily=True)
 def execution_trend(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -129,6 +90,7 @@ def execution_trend(
 # =====================================================
 
 @router.get("/messages/trend")
+@cached_response(daily=True)
 def message_trend(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -137,21 +99,16 @@ def message_trend(
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
 
     results = db.query(
-        func.date(ExecutionLog.created_at).label("date"),
-        func.count(ExecutionLog.id).label("total"),
-        func.sum(
-            case(
-                (ExecutionLog.delivery_status == "delivered", 1),
-                else_=0
-            )
-        ).label("success")
-    ).join(
-        CampaignExecution
+        AnalyticsDailyRollup.day.label("date"),
+        func.sum(AnalyticsDailyRollup.total_count).label("total"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success")
     ).filter(
-        CampaignExecution.organization_id == org_id,
-        ExecutionLog.created_at >= seven_days_ago
+        AnalyticsDailyRollup.organization_id == org_id,
+        AnalyticsDailyRollup.day >= seven_days_ago.date()
     ).group_by(
-        func.date(ExecutionLog.created_at)
+        AnalyticsDailyRollup.day
+    ).order_by(
+        AnalyticsDailyRollup.day
     ).all()
 
     return {
@@ -175,6 +132,7 @@ def message_trend(
 # =====================================================
 
 @router.get("/templates/performance")
+@cached_response
 def template_performance(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -183,21 +141,13 @@ def template_performance(
 
     results = db.query(
         CampaignTemplate.name,
-        func.count(ExecutionLog.id).label("total"),
-        func.sum(
-            case(
-                (ExecutionLog.delivery_status == "delivered", 1),
-                else_=0
-            )
-        ).label("success")
+        func.sum(AnalyticsDailyRollup.total_count).label("total"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success")
     ).join(
-        CampaignExecution,
-        CampaignExecution.campaign_template_id == CampaignTemplate.id
-    ).join(
-        ExecutionLog,
-        ExecutionLog.campaign_execution_id == CampaignExecution.id
+        AnalyticsDailyRollup,
+        AnalyticsDailyRollup.campaign_template_id == CampaignTemplate.id
     ).filter(
-        CampaignTemplate.organization_id == org_id
+        AnalyticsDailyRollup.organization_id == org_id
     ).group_by(
         CampaignTemplate.name
     ).all()
@@ -222,6 +172,7 @@ def template_performance(
 # =====================================================
 
 @router.get("/channels/analytics")
+@cached_response
 def channel_analytics(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -229,20 +180,13 @@ def channel_analytics(
     org_id = current_user.organization_id
 
     results = db.query(
-        ExecutionLog.channel_type,
-        func.count(ExecutionLog.id).label("total"),
-        func.sum(
-            case(
-                (ExecutionLog.delivery_status == "delivered", 1),
-                else_=0
-            )
-        ).label("success")
-    ).join(
-        CampaignExecution
+        AnalyticsDailyRollup.channel_type,
+        func.sum(AnalyticsDailyRollup.total_count).label("total"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success")
     ).filter(
-        CampaignExecution.organization_id == org_id
+        AnalyticsDailyRollup.organization_id == org_id
     ).group_by(
-        ExecutionLog.channel_type
+        AnalyticsDailyRollup.channel_type
     ).all()
 
     return {
@@ -265,6 +209,7 @@ def channel_analytics(
 # =====================================================
 
 @router.get("/executions/running")
+@cached_response
 def running_executions(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
@@ -1,17 +1,32 @@
 import os
 import uuid
 import hashlib
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 import pandas as pd
 from sqlalchemy import func
-from app.models.db_models import CampaignExecution, ExecutionLog
+from app.models.db_models import CampaignExecution, AnalyticsDailyRollup
 from datetime import datetime, timedelta
-import shutil
+import logging
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.db_models import Dataset, CampaignTemplate, TempDataset
-from app.core.csv_engine import parse_csv
+from app.core.csv_engine import CSVParseError
+from app.core.dataset_store import (
+    write_columnar_cache,
+    build_columnar_cache,
+    move_dataset_files,
+    delete_dataset_files,
+    read_dataset_head,
+    to_display_records,
+    mark_build_pending,
+    finish_build,
+    wait_for_build,
+    DatasetStoreError,
+)
+from app.core.upload_stream import stream_upload_to_disk, profile_sample
+from app.core.bitmap_index import try_build_bitmap_index
+from app.core.response_cache import bump_analytics_version
 from app.core.dependencies import CurrentUser, get_current_user
 
 
@@ -40,6 +55,8 @@ os.makedirs(TEMP_DIR, exist_ok=True)
 
 TEMP_DATASETS = {}
 
+logger = logging.getLogger(__name__)
+
 
 # =====================================================
 # TEMP UPLOAD (Used During Template Creation)
@@ -47,6 +64,7 @@ TEMP_DATASETS = {}
 
 @router.post("/temp-upload")
 async def temp_upload(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
@@ -56,21 +74,61 @@ async def temp_upload(
     os.makedirs(TEMP_DIR, exist_ok=True)
 
     file_path = os.path.join(TEMP_DIR, f"{temp_id}.csv")
-    
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    df = pd.read_csv(file_path, dtype=str)
-    df.columns = df.columns.str.strip().str.lower()
-
-    schema = [
-        {
-            "name": col,
-            "type": "number" if pd.to_numeric(df[col], errors="coerce").notna().all() else "string"
+
+    # Single pass: disk write + checksum + size + head sample
+    upload = await stream_upload_to_disk(file, file_path)
+
+    # Fast path: identical content already stored for this org
+    existing = find_reusable_dataset(
+        db,
+        current_user.organization_id,
+        upload["checksum"]
+    )
+
+    if existing:
+        os.remove(file_path)
+
+        # The temp row keeps its own (now empty) path; the stored
+        # files stay owned by the existing dataset
+        temp = TempDataset(
+            id=temp_id,
+            organization_id=current_user.organization_id,
+            original_filename=file.filename,
+            storage_path=file_path,
+            reused_dataset_id=existing.id,
+            schema=existing.schema,
+            row_count=existing.row_count,
+            file_size=existing.file_size,
+            checksum=existing.checksum
+        )
+
+        db.add(temp)
+        db.commit()
+
+        try:
+            preview = to_display_records(read_dataset_head(existing.storage_path, 10))
+        except Exception:
+            preview = []
+
+        return {
+            "temp_dataset_id": str(temp_id),
+            "schema": existing.schema,
+            "row_count": existing.row_count,
+            "row_count_estimated": False,
+            "checksum": existing.checksum,
+            "file_size": existing.file_size,
+            "reused_dataset_id": existing.id,
+            "preview_rows": preview
         }
-        for col in df.columns
-    ]
+
+    try:
+        profile = profile_sample(upload)
+    except CSVParseError as e:
+        os.remove(file_path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    schema = profile["schema"]
+    df = profile["dataframe"]
 
     temp = TempDataset(
         id=temp_id,
@@ -78,73 +136,202 @@ async def temp_upload(
         original_filename=file.filename,
         storage_path=file_path,
         schema=schema,
-        row_count=len(df)
+        row_count=profile["row_count"],
+        file_size=upload["file_size"],
+        checksum=upload["checksum"]
     )
 
     db.add(temp)
     db.commit()
 
+    if upload["is_complete_sample"]:
+        # Whole file already in memory — write the sidecar now
+        try:
+            write_columnar_cache(df, schema, file_path)
+            try_build_bitmap_index(file_path, schema)
+        except DatasetStoreError as e:
+            logger.warning("Columnar cache skipped for %s: %s", temp_id, e)
+    else:
+        # Confirm schema + exact row count + sidecar after responding
+        mark_build_pending(file_path)
+        background_tasks.add_task(
+            build_temp_dataset_cache,
+            temp_id,
+            file_path,
+            schema,
+            upload["encoding"]
+        )
+
     return {
         "temp_dataset_id": str(temp_id),
         "schema": schema,
-        "row_count": len(df),
-        "preview_rows": df.head(10).to_dict(orient="records")
+        "row_count": profile["row_count"],
+        "row_count_estimated": profile["row_count_estimated"],
+        "checksum": upload["checksum"],
+        "file_size": upload["file_size"],
+        "preview_rows": df.head(10).fillna("").to_dict(orient="records")
     }
 
 
+def find_reusable_dataset(
+    db: Session,
+    organization_id: int,
+    checksum: str
+):
+    """
+    Content-addressed lookup: a permanent dataset of this org with
+    the same SHA-256 whose file is still on disk.
+    """
+
+    if not checksum:
+        return None
+
+    candidates = db.query(Dataset).filter(
+        Dataset.organization_id == organization_id,
+        Dataset.checksum == checksum
+    ).order_by(Dataset.created_at.desc()).all()
+
+    for dataset in candidates:
+        if dataset.storage_path and os.path.exists(dataset.storage_path):
+            return dataset
+
+    return None
+
+
+def path_owner(db: Session, organization_id: int, storage_path: str):
+    """
+    The permanent dataset whose files live at storage_path, if any
+    (temp rows from before reused_dataset_id point at them).
+    """
+
+    return db.query(Dataset).filter(
+        Dataset.organization_id == organization_id,
+        Dataset.storage_path == storage_path
+    ).first()
+
+
+def build_temp_dataset_cache(
+    temp_id,
+    file_path: str,
+    schema: list,
+    encoding: str
+):
+    """
+    Background job: full-file schema confirmation, exact row count
+    and columnar sidecar for large uploads.
+    """
+
+    db = SessionLocal()
+
+    try:
+        result = build_columnar_cache(file_path, schema, encoding=encoding)
+        try_build_bitmap_index(file_path, result["schema"])
+
+        temp = db.query(TempDataset).filter(
+            TempDataset.id == temp_id
+        ).first()
+
+        if temp:
+            temp.schema = result["schema"]
+            temp.row_count = result["row_count"]
+            db.commit()
+
+    except Exception as e:
+        logger.warning("Columnar cache build failed for %s: %s", temp_id, e)
+
+    finally:
+        finish_build(file_path)
+        db.close()
+
+
 # =====================================================
 # LIST PERMANENT DATASETS (Org Scoped)
 # =====================================================
 @router.get("/")
 def list_datasets(
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    include_schema: bool = True,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    List datasets with full schema + analytics insights.
+    List datasets with schema + analytics insights.
+
+    Per-dataset stats come from one grouped query (executions per
+    dataset, message totals from the analytics rollup) instead of
+    three queries per dataset. Paged by `page`/`limit` (50 per page
+    by default); include_schema=false drops the full schema.
     """
 
     org_id = current_user.organization_id
 
-    datasets = db.query(Dataset).filter(
+    executions = db.query(
+        CampaignTemplate.dataset_id.label("dataset_id"),
+        func.count(CampaignExecution.id).label("execution_count")
+    ).join(
+        CampaignExecution,
+        CampaignExecution.campaign_template_id == CampaignTemplate.id
+    ).filter(
+        CampaignTemplate.organization_id == org_id,
+        CampaignTemplate.dataset_id.isnot(None)
+    ).group_by(
+        CampaignTemplate.dataset_id
+    ).subquery()
+
+    messages = db.query(
+        CampaignTemplate.dataset_id.label("dataset_id"),
+        func.sum(AnalyticsDailyRollup.total_count).label("total_messages"),
+        func.sum(AnalyticsDailyRollup.delivered_count).label("success_messages")
+    ).join(
+        AnalyticsDailyRollup,
+        AnalyticsDailyRollup.campaign_template_id == CampaignTemplate.id
+    ).filter(
+        CampaignTemplate.organization_id == org_id,
+        CampaignTemplate.dataset_id.isnot(None)
+    ).group_by(
+        CampaignTemplate.dataset_id
+    ).subquery()
+
+    query = db.query(
+        Dataset,
+        executions.c.execution_count,
+        messages.c.total_messages,
+        messages.c.success_messages,
+        func.count().over().label("total")
+    ).outerjoin(
+        executions,
+        executions.c.dataset_id == Dataset.id
+    ).outerjoin(
+        messages,
+        messages.c.dataset_id == Dataset.id
+    ).filter(
         Dataset.organization_id == org_id
-    ).order_by(Dataset.created_at.desc()).all()
+    ).order_by(
+        Dataset.created_at.desc(), Dataset.id.desc()
+    ).offset((page - 1) * limit).limit(limit)
+
+    rows = query.all()
+
+    if rows:
+        total = rows[0].total
+    elif page > 1:
+        # Past the last page — the window count has no row to ride on
+        total = db.query(func.count(Dataset.id)).filter(
+            Dataset.organization_id == org_id
+        ).scalar()
+    else:
+        total = 0
 
     response = []
 
-    for d in datasets:
+    for row in rows:
 
-        execution_count = db.query(func.count(CampaignExecution.id)).join(
-            CampaignTemplate,
-            CampaignExecution.campaign_template_id == CampaignTemplate.id
-        ).filter(
-            CampaignTemplate.dataset_id == d.id,
-            CampaignTemplate.organization_id == org_id
-        ).scalar()
-
-        total_messages = db.query(func.count(ExecutionLog.id)).join(
-            CampaignExecution
-        ).join(
-            CampaignTemplate,
-            CampaignExecution.campaign_template_id == CampaignTemplate.id
-        ).filter(
-            CampaignTemplate.dataset_id == d.id,
-            CampaignTemplate.organization_id == org_id
-        ).scalar()
-
-        success_messages = db.query(func.count(ExecutionLog.id)).join(
-            CampaignExecution
-        ).join(
-            CampaignTemplate,
-            CampaignExecution.campaign_template_id == CampaignTemplate.id
-        ).filter(
-            CampaignTemplate.dataset_id == d.id,
-            CampaignTemplate.organization_id == org_id,
-            ExecutionLog.delivery_status == "delivered"
-        ).scalar()
+        d = row.Dataset
+        total_messages = row.total_messages or 0
 
         success_rate = (
-            (success_messages / total_messages) * 100
+            ((row.success_messages or 0) / total_messages) * 100
             if total_messages else 0
         )
 
@@ -158,26 +345,29 @@ def list_datasets(
 
         string_columns = column_count - numeric_columns
 
-        response.append({
+        item = {
             "id": d.id,
             "original_filename": d.original_filename,
             "row_count": d.row_count or 0,
             "column_count": column_count,
             "numeric_columns": numeric_columns,
             "string_columns": string_columns,
-
-            # 🔥 FULL SCHEMA INCLUDED
-            "schema": schema,
-
-            "execution_count": execution_count or 0,
-            "total_messages_sent": total_messages or 0,
+            "execution_count": row.execution_count or 0,
+            "total_messages_sent": total_messages,
             "success_rate_percent": round(success_rate, 2),
             "file_size_kb": round((d.file_size or 0) / 1024, 2),
             "created_at": d.created_at
-        })
+        }
+
+        if include_schema:
+            item["schema"] = schema
+
+        response.append(item)
 
     return {
-        "total": len(response),
+        "total": total,
+        "page": page,
+        "limit": limit,
         "datasets": response
     }
 
@@ -204,8 +394,61 @@ def move_temp_to_permanent(
             detail="Temp dataset not found or expired. Please re-upload."
         )
 
+    # Reused upload → the dataset it matched
+    if temp.reused_dataset_id:
+        reused = db.query(Dataset).filter(
+            Dataset.id == temp.reused_dataset_id,
+            Dataset.organization_id == current_user.organization_id
+        ).first()
+
+        db.delete(temp)
+        db.commit()
+
+        if not reused:
+            raise HTTPException(
+                status_code=404,
+                detail="Temp dataset not found or expired. Please re-upload."
+            )
+
+        return reused
+
     source_path = temp.storage_path
 
+    # Never move or unlink files a stored dataset owns
+    owner = path_owner(db, current_user.organization_id, source_path)
+
+    if owner:
+        db.delete(temp)
+        db.commit()
+
+        return owner
+
+    # Large uploads may still be profiling in the background; never
+    # move files out from under the sidecar / index builder
+    if not wait_for_build(source_path):
+        raise HTTPException(
+            status_code=409,
+            detail="Dataset is still being processed. Please retry shortly."
+        )
+
+    db.refresh(temp)
+
+    # Fast path: same content already promoted → reuse it
+    existing = find_reusable_dataset(
+        db,
+        current_user.organization_id,
+        temp.checksum
+    )
+
+    if existing:
+        if os.path.exists(source_path):
+            delete_dataset_files(source_path)
+
+        db.delete(temp)
+        db.commit()
+
+        return existing
+
     # 2️⃣ Validate file exists
     if not os.path.exists(source_path):
         raise HTTPException(
@@ -221,8 +464,8 @@ def move_temp_to_permanent(
     destination_path = os.path.join(PERM_DIR, file_name)
 
     try:
-        # 5️⃣ Move file safely
-        shutil.move(source_path, destination_path)
+        # 5️⃣ Move file (and columnar sidecar) safely
+        move_dataset_files(source_path, destination_path)
 
         # 6️⃣ Create permanent dataset record
         dataset = Dataset(
@@ -231,6 +474,9 @@ def move_temp_to_permanent(
             storage_path=destination_path,
             row_count=temp.row_count,
             schema=temp.schema,
+            file_size=temp.file_size,
+            checksum=temp.checksum,
+            uploaded_by=current_user.id,
             created_at=datetime.utcnow()
         )
 
@@ -242,6 +488,8 @@ def move_temp_to_permanent(
         db.commit()
         db.refresh(dataset)
 
+        bump_analytics_version(current_user.organization_id)
+
         return dataset
 
     except Exception as e:
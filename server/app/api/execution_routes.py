@@ -1,7 +1,11 @@
 import os
+import io
+import csv
+import json
 import uuid
+import zlib
 import threading
-from typing import List, Dict
+from typing import List, Dict, Optional, Iterator
 
 from fastapi import (
     APIRouter,
@@ -10,21 +14,43 @@ from fastapi import (
     UploadFile,
     File,
     Form,
+    Query,
 )
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 from datetime import datetime
-import pandas as pd
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.db_models import (
     CampaignExecution,
     CampaignTemplate,
     ChannelIntegration,
     ExecutionLog,
+    Dataset,
 )
 from app.core.execution_engine import run_campaign_execution
+from app.core.response_cache import bump_analytics_version
 from app.core.dependencies import get_current_user
-from app.core.filter_engine import apply_filter
+from app.core.filter_cache import apply_filter_cached
+from app.core.filter_engine import (
+    expected_column_types,
+    iter_conditions,
+)
+from app.core.upload_stream import stream_upload_to_disk
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from app.core.log_partitions import read_archived_logs, read_archived_log_page
+from app.core.dataset_validator import (
+    validate_dataset_compatibility,
+    validate_operator_datatype,
+)
+from app.core.csv_engine import read_csv_frame, CSVParseError
+from app.core.schema_engine import (
+    infer_schema,
+    schema_types,
+    schema_cache,
+    file_checksum,
+)
 
 
 # =====================================================
@@ -36,6 +62,9 @@ router = APIRouter(prefix="/execution", tags=["Execution"])
 EXECUTION_UPLOAD_DIR = "execution_uploads"
 os.makedirs(EXECUTION_UPLOAD_DIR, exist_ok=True)
 
+# Rows fetched per server-side cursor round trip during exports
+EXPORT_CHUNK_SIZE = int(os.getenv("LOG_EXPORT_CHUNK_SIZE", "5000"))
+
 
 # =====================================================
 # Utilities
@@ -52,18 +81,22 @@ def normalize_column(value: str) -> str:
     )
 
 
-def detect_column_type(series: pd.Series) -> str:
-    numeric_ratio = pd.to_numeric(series, errors="coerce").notna().sum() / len(series)
-    return "number" if numeric_ratio > 0.9 else "string"
+def read_upload_with_schema(file: UploadFile):
+    """
+    Parse an ad-hoc CSV upload and get its schema from the shared
+    engine (cached by content checksum, so validate → run on the
+    same file profiles it once and sees the same types).
+    """
 
+    try:
+        checksum = file_checksum(file.file)
+        df = read_csv_frame(file.file)
+    except (CSVParseError, OSError):
+        raise HTTPException(400, "Invalid CSV file.")
 
-def validate_datatype_for_operator(
-    column_type: str,
-    operator: str
-):
-    if operator in ["<", ">", "<=", ">="] and column_type != "number":
-        return False
-    return True
+    schema = schema_cache.get_or_infer(checksum, lambda: infer_schema(df))
+
+    return df, schema, checksum
 
 
 # =====================================================
@@ -95,19 +128,10 @@ async def validate_execution(
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "Only CSV files are allowed.")
 
-    try:
-        df = pd.read_csv(file.file, dtype=str)
-    except Exception:
-        raise HTTPException(400, "Invalid CSV file.")
-
-    df.columns = (
-        df.columns
-        .str.replace("\ufeff", "", regex=False)
-        .str.strip()
-        .str.lower()
-    )
+    df, schema, checksum = read_upload_with_schema(file)
 
     schema_fields = list(df.columns)
+    column_types = schema_types(schema)
     errors: List[Dict] = []
 
     # 1️⃣ Recipient Column Check
@@ -130,7 +154,7 @@ async def validate_execution(
 
     # 3️⃣ Filter Validation
     if template.filter_dsl:
-        for cond in template.filter_dsl.get("conditions", []):
+        for cond in iter_conditions(template.filter_dsl):
             raw_col = cond.get("column")
             operator = cond.get("operator")
 
@@ -144,15 +168,15 @@ async def validate_execution(
                 })
                 continue
 
-            detected_type = detect_column_type(df[col])
+            detected_type = column_types.get(col, "string")
 
-            if not validate_datatype_for_operator(detected_type, operator):
+            if not validate_operator_datatype(detected_type, operator):
                 errors.append({
                     "type": "datatype_mismatch",
                     "column": raw_col,
-                    "expected": "number",
+                    "expected": expected_column_types(operator),
                     "found": detected_type,
-                    "message": f"Column '{raw_col}' must be numeric for operator '{operator}'."
+                    "message": f"Column '{raw_col}' must be {expected_column_types(operator)} for operator '{operator}'."
                 })
 
     if errors:
@@ -161,9 +185,9 @@ async def validate_execution(
             "errors": errors
         }
 
-    # Apply filter preview
+    # Apply filter preview (result cached for the run on this file)
     try:
-        filtered_df = apply_filter(df, template.filter_dsl or {}, [])
+        filtered_df = apply_filter_cached(df, template.filter_dsl, schema, checksum)
     except Exception as e:
         return {
             "valid": False,
@@ -177,13 +201,7 @@ async def validate_execution(
         "valid": True,
         "total_rows": len(df),
         "filtered_rows": len(filtered_df),
-        "schema": [
-            {
-                "name": col,
-                "type": detect_column_type(df[col])
-            }
-            for col in df.columns
-        ]
+        "schema": schema
     }
 
 
@@ -196,10 +214,17 @@ async def run_execution(
     channel_type: str = Form(...),
     recipient_column: str = Form(...),
     integration_id: int = Form(...),
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[int] = Form(None),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
+    """
+    Two modes:
+        - file uploaded → run against that CSV (deleted after run)
+        - no file → run against a stored Dataset (dataset_id, or
+          the template's own dataset), read from its columnar copy
+    """
 
     recipient_column = normalize_column(recipient_column)
 
@@ -214,6 +239,30 @@ async def run_execution(
     if not template:
         raise HTTPException(404, "Published template not found.")
 
+    dataset = None
+
+    if not file:
+        dataset = db.query(Dataset).filter(
+            Dataset.id == (dataset_id or template.dataset_id),
+            Dataset.organization_id == current_user.organization_id
+        ).first()
+
+        if not dataset or not os.path.exists(dataset.storage_path):
+            raise HTTPException(404, "Dataset not found. Upload a CSV instead.")
+
+        # Schema-only check — no file is read here
+        is_valid, errors = validate_dataset_compatibility(
+            template,
+            dataset.schema,
+            recipient_column
+        )
+
+        if not is_valid:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "Dataset is not compatible with template.", "errors": errors}
+            )
+
     integration = db.query(ChannelIntegration).filter(
         ChannelIntegration.id == integration_id,
         ChannelIntegration.organization_id == current_user.organization_id,
@@ -237,17 +286,21 @@ async def run_execution(
             detail="An execution is already running."
         )
 
-    # Save uploaded file
-    unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = os.path.join(EXECUTION_UPLOAD_DIR, unique_filename)
+    if dataset:
+        file_path = dataset.storage_path
+    else:
+        # Save uploaded file
+        unique_filename = f"{uuid.uuid4()}_{file.filename}"
+        file_path = os.path.join(EXECUTION_UPLOAD_DIR, unique_filename)
 
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
+        # Streamed in chunks — memory stays flat for large audiences
+        await stream_upload_to_disk(file, file_path)
 
     execution = CampaignExecution(
         organization_id=current_user.organization_id,
         campaign_template_id=template.id,
         file_path=file_path,
+        dataset_id=dataset.id if dataset else None,
         channel_type=channel_type,
         recipient_column=recipient_column,
         channel_integration_id=integration.id,
@@ -264,6 +317,8 @@ async def run_execution(
     db.commit()
     db.refresh(execution)
 
+    bump_analytics_version(current_user.organization_id)
+
     threading.Thread(
         target=run_campaign_execution,
         args=(execution.id,),
@@ -311,21 +366,85 @@ def get_execution_status(
 
 
 # =====================================================
-# 4️⃣ LIST EXECUTIONS
+# 4️⃣ LIST EXECUTIONS (Keyset Paginated)
 # =====================================================
 
+EXECUTION_STATUSES = ["queued", "running", "completed", "failed", "cancelled"]
+
+
 @router.get("/")
 def list_executions(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: Optional[str] = None,
+    template_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-
-    executions = db.query(CampaignExecution).filter(
+    """
+    Newest first, paged by an opaque cursor on (created_at, id),
+    50 per page by default. Only the returned columns are selected;
+    org + status filters use idx_execution_org_status, the rest
+    idx_execution_org_created.
+    """
+
+    if status and status not in EXECUTION_STATUSES:
+        raise HTTPException(400, f"status must be one of {EXECUTION_STATUSES}.")
+
+    query = db.query(
+        CampaignExecution.id,
+        CampaignExecution.campaign_template_id,
+        CampaignExecution.status,
+        CampaignExecution.success_count,
+        CampaignExecution.failure_count,
+        CampaignExecution.created_at
+    ).filter(
         CampaignExecution.organization_id == current_user.organization_id
-    ).order_by(CampaignExecution.created_at.desc()).all()
+    )
+
+    if status:
+        query = query.filter(CampaignExecution.status == status)
+
+    if template_id:
+        query = query.filter(CampaignExecution.campaign_template_id == template_id)
+
+    if created_from:
+        query = query.filter(CampaignExecution.created_at >= created_from)
+
+    if created_to:
+        query = query.filter(CampaignExecution.created_at < created_to)
+
+    total = query.order_by(None).count()
+
+    if cursor:
+        try:
+            created_at, execution_id = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(400, str(e))
+
+        query = query.filter(
+            tuple_(CampaignExecution.created_at, CampaignExecution.id)
+            < tuple_(created_at, execution_id)
+        )
+
+    # One extra row tells whether there is a next page
+    executions = query.order_by(
+        CampaignExecution.created_at.desc(),
+        CampaignExecution.id.desc()
+    ).limit(limit + 1).all()
+
+    has_more = len(executions) > limit
+    executions = executions[:limit]
 
     return {
-        "total": len(executions),
+        "total": total,
+        "limit": limit,
+        "next_cursor": (
+            encode_cursor(executions[-1].created_at, executions[-1].id)
+            if has_more else None
+        ),
         "executions": [
             {
                 "execution_id": e.id,
@@ -368,6 +487,8 @@ def cancel_execution(
     execution.status = "cancelled"
     db.commit()
 
+    bump_analytics_version(current_user.organization_id)
+
     return {
         "success": True,
         "message": "Execution cancelled."
@@ -375,17 +496,41 @@ def cancel_execution(
 
 
 # =====================================================
-# 6️⃣ GET EXECUTION LOGS (Paginated)
+# 6️⃣ GET EXECUTION LOGS (Keyset Paginated)
 # =====================================================
 
+LOG_STATUSES = ["delivered", "failed"]
+
+LOG_COLUMNS = [
+    ExecutionLog.id,
+    ExecutionLog.recipient_value,
+    ExecutionLog.delivery_status,
+    ExecutionLog.provider_response_message,
+    ExecutionLog.retry_count,
+    ExecutionLog.created_at,
+]
+
+
 @router.get("/{execution_id}/logs")
 def get_execution_logs(
     execution_id: int,
-    page: int = 1,
-    limit: int = 50,
+    cursor: Optional[str] = None,
+    page: Optional[int] = Query(None, ge=1, deprecated=True),
+    limit: int = Query(50, ge=1, le=500),
+    status: Optional[str] = None,
+    recipient: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
+    """
+    Newest first, paged by an opaque cursor on (created_at, id) —
+    an index seek on idx_logs_execution_created, so every page
+    costs the same. Pass the previous page's next_cursor to go on.
+    `page` (OFFSET paging) is deprecated: it is still honoured when
+    no cursor is given, but deep pages re-read every earlier row.
+    Pages running past the live partitions continue in the org's
+    log archive (months archived by core/log_partitions).
+    """
 
     execution = db.query(CampaignExecution).filter(
         CampaignExecution.id == execution_id,
@@ -395,33 +540,269 @@ def get_execution_logs(
     if not execution:
         raise HTTPException(404, "Execution not found.")
 
-    offset = (page - 1) * limit
+    if status and status not in LOG_STATUSES:
+        raise HTTPException(400, f"status must be one of {LOG_STATUSES}.")
+
+    query = db.query(*LOG_COLUMNS).filter(
+        ExecutionLog.campaign_execution_id == execution_id,
+        # Logs never predate their execution → older partitions pruned
+        ExecutionLog.created_at >= execution.created_at
+    )
+
+    if status:
+        query = query.filter(ExecutionLog.delivery_status == status)
+
+    if recipient:
+        query = query.filter(ExecutionLog.recipient_value == recipient)
+
+    before = None
+
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(400, str(e))
+
+        query = query.filter(
+            tuple_(ExecutionLog.created_at, ExecutionLog.id) < tuple_(*before)
+        )
+
+    live = query
+    offset = (page - 1) * limit if page and not cursor else 0
+
+    query = query.order_by(
+        ExecutionLog.created_at.desc(),
+        ExecutionLog.id.desc()
+    )
+
+    if offset:
+        # Deep pages re-read every earlier row — cursors don't
+        query = query.offset(offset)
+
+    # One extra row tells whether there is a next page
+    logs = [row._asdict() for row in query.limit(limit + 1).all()]
+
+    if len(logs) <= limit:
+        # Archived months are all older than the live rows, so the
+        # page continues there. Past the live rows, an offset page
+        # skips however many live rows there are.
+        names = [column.name for column in LOG_COLUMNS]
+
+        archived = read_archived_log_page(
+            execution.organization_id,
+            execution_id,
+            execution.created_at,
+            names,
+            limit + 1 - len(logs),
+            offset=max(0, offset - live.count()) if offset and not logs else 0,
+            before=before,
+            status=status,
+            recipient=recipient
+        )
+
+        logs += [dict(zip(names, row)) for row in archived]
 
-    logs = db.query(ExecutionLog).filter(
-        ExecutionLog.campaign_execution_id == execution_id
-    ).order_by(ExecutionLog.created_at.desc()).offset(offset).limit(limit).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
 
-    total_logs = db.query(ExecutionLog).filter(
-        ExecutionLog.campaign_execution_id == execution_id
-    ).count()
+    # Totals from the execution's counters (no COUNT over the logs)
+    if recipient:
+        total_logs = None
+    elif status == "delivered":
+        total_logs = execution.success_count
+    elif status == "failed":
+        total_logs = execution.failure_count
+    else:
+        total_logs = execution.processed_count
 
     return {
         "total_logs": total_logs,
-        "page": page,
+        "page": page if not cursor else None,
         "limit": limit,
+        "next_cursor": (
+            encode_cursor(logs[-1]["created_at"], logs[-1]["id"]) if has_more else None
+        ),
         "logs": [
             {
-                "recipient": log.recipient_value,
-                "status": log.delivery_status,
-                "error": log.provider_response_message,
-                "retry_count": log.retry_count,
-                "timestamp": log.created_at
+                "recipient": log["recipient_value"],
+                "status": log["delivery_status"],
+                "error": log["provider_response_message"],
+                "retry_count": log["retry_count"],
+                "timestamp": log["created_at"]
             }
             for log in logs
         ]
     }
 
 
+# =====================================================
+# 6️⃣b EXPORT EXECUTION LOGS (Streaming)
+# =====================================================
+
+EXPORT_FORMATS = ["csv", "ndjson"]
+
+EXPORT_COLUMNS = [
+    ("log_id", ExecutionLog.id),
+    ("recipient", ExecutionLog.recipient_value),
+    ("channel", ExecutionLog.channel_type),
+    ("status", ExecutionLog.delivery_status),
+    ("retry_count", ExecutionLog.retry_count),
+    ("error", ExecutionLog.provider_response_message),
+    ("provider_message_id", ExecutionLog.provider_message_id),
+    ("sent_at", ExecutionLog.sent_at),
+    ("created_at", ExecutionLog.created_at),
+]
+
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_log_chunk(rows, format: str, header: bool) -> str:
+    if format == "ndjson":
+        names = [name for name, _ in EXPORT_COLUMNS]
+        return "".join(
+            json.dumps(dict(zip(names, map(export_value, row)))) + "\n"
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if header:
+        writer.writerow([name for name, _ in EXPORT_COLUMNS])
+
+    writer.writerows([map(export_value, row) for row in rows])
+
+    return buffer.getvalue()
+
+
+def stream_execution_logs(
+    execution_id: int,
+    organization_id: int,
+    since: datetime,
+    format: str,
+    status: Optional[str],
+    compress: bool
+) -> Iterator[bytes]:
+    """
+    Logs in (created_at, id) order: archived months first (from the
+    org's log archive), then the live partitions through a
+    server-side cursor, EXPORT_CHUNK_SIZE rows at a time — memory
+    stays flat however many rows the execution has. Runs in its own
+    session: the request's session is closed before the body is
+    streamed.
+    """
+
+    db: Session = SessionLocal()
+
+    # gzip container (wbits 16 + 15), fed chunk by chunk
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    try:
+        query = select(*[column for _, column in EXPORT_COLUMNS]).where(
+            ExecutionLog.campaign_execution_id == execution_id,
+            ExecutionLog.created_at >= since
+        )
+
+        if status:
+            query = query.where(ExecutionLog.delivery_status == status)
+
+        result = db.execute(
+            query.order_by(ExecutionLog.created_at, ExecutionLog.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+
+        def encode(rows, header):
+            data = encode_log_chunk(rows, format, header).encode("utf-8")
+
+            if not compressor:
+                return data
+
+            # Sync flush → each chunk reaches the client right away
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        header = True
+
+        archived = read_archived_logs(
+            organization_id,
+            execution_id,
+            since,
+            [column.name for _, column in EXPORT_COLUMNS],
+            status
+        )
+
+        for rows in archived:
+            yield encode(rows, header)
+            header = False
+
+        for rows in result.partitions():
+            yield encode(rows, header)
+            header = False
+
+        if header and format == "csv":
+            # No rows — still a valid CSV with its header
+            yield encode([], True)
+
+        if compressor:
+            yield compressor.flush()
+
+    finally:
+        db.close()
+
+
+@router.get("/{execution_id}/logs/export")
+def export_execution_logs(
+    execution_id: int,
+    format: str = "csv",
+    status: Optional[str] = None,
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Full delivery report as CSV or NDJSON (optionally gzipped),
+    streamed as rows are read.
+    """
+
+    execution = db.query(
+        CampaignExecution.id,
+        CampaignExecution.created_at
+    ).filter(
+        CampaignExecution.id == execution_id,
+        CampaignExecution.organization_id == current_user.organization_id
+    ).first()
+
+    if not execution:
+        raise HTTPException(404, "Execution not found.")
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(400, f"format must be one of {EXPORT_FORMATS}.")
+
+    if status and status not in LOG_STATUSES:
+        raise HTTPException(400, f"status must be one of {LOG_STATUSES}.")
+
+    filename = f"execution_{execution_id}_logs.{format}" + (".gz" if gzip else "")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+
+    return StreamingResponse(
+        stream_execution_logs(
+            execution_id,
+            current_user.organization_id,
+            execution.created_at,
+            format,
+            status,
+            gzip
+        ),
+        media_type="application/gzip" if gzip else media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 # =====================================================
 # 7️⃣ PREVIEW SCHEMA
 # =====================================================
@@ -435,25 +816,7 @@ async def preview_schema(
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "Only CSV files are allowed.")
 
-    try:
-        df = pd.read_csv(file.file, dtype=str)
-    except Exception:
-        raise HTTPException(400, "Invalid CSV file.")
-
-    df.columns = (
-        df.columns
-        .str.replace("\ufeff", "", regex=False)
-        .str.strip()
-        .str.lower()
-    )
-
-    schema = [
-        {
-            "name": col,
-            "type": detect_column_type(df[col])
-        }
-        for col in df.columns
-    ]
+    df, schema, checksum = read_upload_with_schema(file)
 
     return {
         "row_count": len(df),
@@ -0,0 +1,199 @@
+# app/api/sse_routes.py
+
+import json
+from contextlib import aclosing
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.db_models import CampaignExecution
+from app.core.dependencies import security
+from app.core.progress_manager import progress_manager, TERMINAL_STATUSES
+from app.core.security import decode_access_token
+
+
+router = APIRouter()
+
+SSE_RETRY_MS = 3000
+SSE_KEEPALIVE_SECONDS = 15
+
+
+# =====================================================
+# Utilities
+# =====================================================
+
+def format_sse(data: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+
+    lines.append("event: progress")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+
+    return "\n".join(lines) + "\n\n"
+
+
+def execution_snapshot(execution: CampaignExecution) -> dict:
+    return {
+        "status": execution.status,
+        "processed": execution.processed_count,
+        "total": execution.total_count,
+        "success": execution.success_count,
+        "failed": execution.failure_count,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def load_snapshot(execution_id: int) -> Optional[dict]:
+    """
+    Fresh DB state of an execution (short-lived session).
+    """
+
+    db: Session = SessionLocal()
+
+    try:
+        execution = db.query(CampaignExecution).filter(
+            CampaignExecution.id == execution_id
+        ).first()
+
+        return execution_snapshot(execution) if execution else None
+
+    finally:
+        db.close()
+
+
+def snapshot_changed(previous: dict, current: dict) -> bool:
+    return any(
+        previous.get(key) != current.get(key)
+        for key in ("status", "processed", "total", "success", "failed")
+    )
+
+
+# =====================================================
+# SSE: EXECUTION PROGRESS (SECURE)
+# =====================================================
+
+@router.get("/execution/{execution_id}/events")
+async def execution_events(
+    execution_id: int,
+    request: Request,
+    token: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """
+    Server-Sent Events stream fed from the same source as
+    /ws/execution/{execution_id}.
+
+    EventSource cannot set headers, so the access token may also
+    be passed as ?token=. Reconnects send Last-Event-ID and only
+    receive state newer than that id.
+    """
+
+    # ---------------------------------------------
+    # 1️⃣ Authenticate
+    # ---------------------------------------------
+    raw_token = credentials.credentials if credentials else token
+
+    payload = decode_access_token(raw_token) if raw_token else None
+
+    if not payload or not payload.get("user_id") or not payload.get("organization_id"):
+        raise HTTPException(401, "Invalid or expired access token.")
+
+    organization_id = payload.get("organization_id")
+
+    # ---------------------------------------------
+    # 2️⃣ Validate Execution Ownership
+    # ---------------------------------------------
+    db: Session = SessionLocal()
+
+    try:
+        execution = db.query(CampaignExecution).filter(
+            CampaignExecution.id == execution_id,
+            CampaignExecution.organization_id == organization_id
+        ).first()
+
+        if not execution:
+            raise HTTPException(404, "Execution not found.")
+
+        snapshot = execution_snapshot(execution)
+
+    finally:
+        # Never hold a DB connection for the lifetime of the stream
+        db.close()
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        resume_from = 0
+
+    # ---------------------------------------------
+    # 3️⃣ Stream
+    # ---------------------------------------------
+    async def event_stream():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        latest = progress_manager.latest(execution_id)
+
+        if not latest:
+            # Nothing broadcast yet (or already pruned) → DB state
+            yield format_sse(snapshot)
+
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+
+        elif latest[1].get("status") in TERMINAL_STATUSES and resume_from >= latest[0]:
+            # Client already saw the final event
+            return
+
+        last_snapshot = snapshot
+
+        # Ids restart with the process; a stale Last-Event-ID means resend
+        since = resume_from if latest and resume_from <= latest[0] else 0
+
+        events = progress_manager.subscribe(
+            execution_id,
+            last_event_id=since,
+            keepalive_seconds=SSE_KEEPALIVE_SECONDS
+        )
+
+        # aclosing → listener is unregistered as soon as we stop
+        async with aclosing(events):
+            async for event in events:
+                if await request.is_disconnected():
+                    return
+
+                if event is None:
+                    yield ": keepalive\n\n"
+
+                    # Progress events are per process; when the run
+                    # lives on another worker only the DB moves
+                    current = await run_in_threadpool(load_snapshot, execution_id)
+
+                    if current and snapshot_changed(last_snapshot, current):
+                        last_snapshot = current
+                        yield format_sse(current)
+
+                        if current["status"] in TERMINAL_STATUSES:
+                            return
+
+                    continue
+
+                event_id, message = event
+                yield format_sse(message, event_id)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,95 @@
+# app/core/analytics_rollup.py
+
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.db_models import (
+    AnalyticsDailyRollup,
+    CampaignExecution,
+    ExecutionLog,
+)
+
+
+# =====================================================
+# BUCKETS
+# =====================================================
+
+def rollup_buckets(
+    execution: CampaignExecution,
+    logs: List[ExecutionLog]
+) -> List[Dict]:
+    """
+    One row per (day, channel) bucket for a flushed log batch.
+    """
+
+    buckets: Dict[Tuple, Dict] = {}
+    now = datetime.utcnow()
+
+    for log in logs:
+        day = (log.created_at or now).date()
+        key = (day, log.channel_type)
+
+        bucket = buckets.get(key)
+
+        if bucket is None:
+            bucket = buckets[key] = {
+                "organization_id": execution.organization_id,
+                "day": day,
+                "channel_type": log.channel_type,
+                "campaign_template_id": execution.campaign_template_id,
+                "total_count": 0,
+                "delivered_count": 0,
+                "failed_count": 0,
+                "retry_count": 0,
+                "updated_at": now,
+            }
+
+        bucket["total_count"] += 1
+        bucket["retry_count"] += log.retry_count or 0
+
+        if log.delivery_status == "delivered":
+            bucket["delivered_count"] += 1
+        elif log.delivery_status == "failed":
+            bucket["failed_count"] += 1
+
+    return list(buckets.values())
+
+
+# =====================================================
+# WRITER
+# =====================================================
+
+def record_log_rollup(
+    db: Session,
+    execution: CampaignExecution,
+    logs: List[ExecutionLog]
+):
+    """
+    Add a log batch to the daily rollup. Runs in the caller's
+    transaction — call before the commit that persists the logs,
+    so both land (or roll back) together.
+    """
+
+    rows = rollup_buckets(execution, logs)
+
+    if not rows:
+        return
+
+    stmt = insert(AnalyticsDailyRollup).values(rows)
+    table = AnalyticsDailyRollup.__table__.c
+
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_rollup_bucket",
+        set_={
+            "total_count": table.total_count + stmt.excluded.total_count,
+            "delivered_count": table.delivered_count + stmt.excluded.delivered_count,
+            "failed_count": table.failed_count + stmt.excluded.failed_count,
+            "retry_count": table.retry_count + stmt.excluded.retry_count,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+
+    db.execute(stmt)
@@ -0,0 +1,138 @@
+# app/core/analytics_summary.py
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import analytics_versions
+from app.models.db_models import (
+    AnalyticsDailyRollup,
+    CampaignExecution,
+    CampaignTemplate,
+    Dataset,
+    Organization,
+)
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+ORG_SUMMARY_TTL_SECONDS = float(os.getenv("ORG_SUMMARY_TTL_SECONDS", "15"))
+
+
+# =====================================================
+# TTL CACHE
+# =====================================================
+
+class TTLCache:
+    """
+    Per-key values that expire after a fixed number of seconds.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: Dict[Any, Tuple[float, Any]] = {}
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute: Callable[[], Any]):
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = (now + self.ttl, value)
+
+            # Drop expired keys so idle orgs don't accumulate
+            for stale in [k for k, (expires, _) in self.entries.items() if expires <= now]:
+                del self.entries[stale]
+
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+# Singleton instance
+org_summary_cache = TTLCache(ORG_SUMMARY_TTL_SECONDS)
+
+
+# =====================================================
+# SINGLE-PASS ORG STATS
+# =====================================================
+
+def query_org_stats(db: Session, org_id: int) -> Dict[str, Any]:
+    """
+    Every org-level number the summary and overview show, in one
+    statement: conditional aggregates over the org's executions,
+    rollup sums for messages and scalar counts for the rest.
+    """
+
+    completed = CampaignExecution.status == "completed"
+
+    executions = select(
+        func.count(CampaignExecution.id).label("total_executions"),
+        func.count(CampaignExecution.id).filter(completed).label("completed_executions"),
+        func.avg(CampaignExecution.execution_duration_seconds).filter(completed).label("avg_duration"),
+    ).where(
+        CampaignExecution.organization_id == org_id
+    ).subquery()
+
+    messages = select(
+        func.coalesce(func.sum(AnalyticsDailyRollup.total_count), 0).label("total_messages"),
+        func.coalesce(func.sum(AnalyticsDailyRollup.delivered_count), 0).label("success_messages"),
+        func.coalesce(func.sum(AnalyticsDailyRollup.failed_count), 0).label("failed_messages"),
+        func.coalesce(func.sum(AnalyticsDailyRollup.retry_count), 0).label("total_retries"),
+    ).where(
+        AnalyticsDailyRollup.organization_id == org_id
+    ).subquery()
+
+    organization_name = select(Organization.name).where(
+        Organization.id == org_id
+    ).scalar_subquery()
+
+    total_templates = select(func.count(CampaignTemplate.id)).where(
+        CampaignTemplate.organization_id == org_id,
+        CampaignTemplate.is_deleted == False
+    ).scalar_subquery()
+
+    total_datasets = select(func.count(Dataset.id)).where(
+        Dataset.organization_id == org_id
+    ).scalar_subquery()
+
+    row = db.execute(
+        select(
+            executions,
+            messages,
+            organization_name.label("organization_name"),
+            total_templates.label("total_templates"),
+            total_datasets.label("total_datasets"),
+        )
+    ).mappings().one()
+
+    stats = dict(row)
+    stats["avg_duration"] = float(stats["avg_duration"] or 0)
+
+    return stats
+
+
+def get_org_stats(db: Session, org_id: int) -> Dict[str, Any]:
+    """
+    query_org_stats, shared by every dashboard call of the org for
+    ORG_SUMMARY_TTL_SECONDS (or until its analytics version moves).
+    """
+    return org_summary_cache.get_or_compute(
+        (org_id, analytics_versions.get(org_id)),
+        lambda: query_org_stats(db, org_id)
+    )
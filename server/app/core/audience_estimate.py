@@ -0,0 +1,89 @@
+# app/core/audience_estimate.py
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.filter_engine import (
+    FilterPlan,
+    FilterGroup,
+    FilterNot,
+)
+
+
+# =====================================================
+# ESTIMATION
+# =====================================================
+
+def estimate_node(node, index) -> Tuple[float, bool]:
+    """
+    (share of rows matching, exact?) for one plan node.
+
+    Conditions the bitmap index can answer are exact; the rest use
+    the selectivity the planner derived from schema stats
+    (histograms, value counts, distinct counts), combined assuming
+    independence.
+    """
+
+    mask = node.index_mask(index) if index is not None else None
+
+    if mask is not None:
+        return float(mask.mean()) if len(mask) else 0.0, True
+
+    if isinstance(node, FilterNot):
+        share, exact = estimate_node(node.child, index)
+        return 1 - share, exact
+
+    if not isinstance(node, FilterGroup):
+        return node.estimate, False
+
+    # Index-answerable children combine exactly as one bitmap
+    masks = []
+    shares = []
+
+    for child in node.children:
+        child_mask = child.index_mask(index) if index is not None else None
+
+        if child_mask is not None:
+            masks.append(child_mask)
+        else:
+            shares.append(estimate_node(child, index)[0])
+
+    if node.logic == "AND":
+        if masks:
+            shares.append(float(np.logical_and.reduce(masks).mean()))
+        return float(np.prod(shares)), False
+
+    if masks:
+        shares.append(float(np.logical_or.reduce(masks).mean()))
+    return 1 - float(np.prod([1 - share for share in shares])), False
+
+
+def estimate_audience(
+    plan: Optional[FilterPlan],
+    row_count: int,
+    index=None
+) -> Dict:
+    """
+    Audience size for a compiled filter without reading the dataset.
+    """
+
+    if index is not None:
+        row_count = index.row_count
+
+    if plan is None:
+        return {
+            "row_count": row_count,
+            "matched_count": row_count,
+            "exact": True,
+            "method": "row_count",
+        }
+
+    share, exact = estimate_node(plan.root, index)
+
+    return {
+        "row_count": row_count,
+        "matched_count": int(round(share * row_count)),
+        "exact": exact,
+        "method": "bitmap_index" if exact else "statistics",
+    }
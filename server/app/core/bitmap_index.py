@@ -0,0 +1,322 @@
+# app/core/bitmap_index.py
+
+import os
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.core.dataset_store import (
+    index_path,
+    has_columnar_cache,
+    read_dataset_frame,
+)
+from app.core.filter_cache import pack_mask, unpack_mask
+from app.core.filter_engine import convert_column, normalize_column_name
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+BITMAP_INDEX_ENABLED = os.getenv("BITMAP_INDEX_ENABLED", "true").lower() == "true"
+
+# Columns with more distinct values than this are not indexed
+INDEX_MAX_DISTINCT = int(os.getenv("BITMAP_INDEX_MAX_DISTINCT", "64"))
+
+# Ranges and dates are answered by the filter engine, not bitmaps
+INDEXED_TYPES = ("number", "boolean", "category", "string")
+
+# Loaded indexes kept in memory (keyed by path + mtime)
+INDEX_CACHE_SIZE = 32
+
+ROW_COUNT_METADATA_KEY = b"row_count"
+
+INDEX_SCHEMA = pa.schema([
+    ("column", pa.string()),
+    ("value", pa.string()),
+    ("bitmap", pa.binary()),
+])
+
+
+# =====================================================
+# KEYS
+# =====================================================
+
+def index_key(value) -> str:
+    """
+    Cell / operand → index key. Numbers key by float so a filter
+    on 3 finds cells stored as 3 or 3.0 (same rule as ==).
+    """
+
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return repr(float(value))
+
+    return str(value)
+
+
+# Blank cells are missing, never an indexed value (older indexes
+# built from "" categories may still hold this key)
+MISSING_KEY = index_key("")
+
+
+def compress_mask(mask: np.ndarray) -> bytes:
+    return zlib.compress(pack_mask(mask), 1)
+
+
+def decompress_mask(bitmap: bytes, row_count: int) -> np.ndarray:
+    return unpack_mask(zlib.decompress(bitmap), row_count)
+
+
+# =====================================================
+# INDEX
+# =====================================================
+
+class BitmapIndex:
+    """
+    Per-dataset value → row bitmap map for low-cardinality columns.
+
+    Bitmaps stay compressed until a filter asks for them; each is
+    decompressed at most once per loaded index.
+    """
+
+    def __init__(self, row_count: int, bitmaps: Dict[str, Dict[str, bytes]]):
+        self.row_count = row_count
+        self.bitmaps = bitmaps
+        self.unpacked: Dict[tuple, np.ndarray] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.bitmaps)
+
+    def covers(self, column: str) -> bool:
+        return column in self.bitmaps
+
+    def value_counts(self, column: str) -> Dict[str, int]:
+        return {
+            key: int(self.value_mask(column, key).sum())
+            for key in self.bitmaps.get(column, {})
+        }
+
+    def value_mask(self, column: str, key: str) -> np.ndarray:
+        with self.lock:
+            mask = self.unpacked.get((column, key))
+
+        if mask is None:
+            bitmap = self.bitmaps[column].get(key)
+
+            if bitmap is None:
+                return np.zeros(self.row_count, dtype=bool)
+
+            mask = decompress_mask(bitmap, self.row_count)
+
+            with self.lock:
+                self.unpacked[(column, key)] = mask
+
+        return mask
+
+    def mask(self, column: str, values: list) -> np.ndarray:
+        """
+        Rows whose cell equals any of values (unknown values match
+        nothing — the index holds every distinct value).
+        """
+
+        mask = np.zeros(self.row_count, dtype=bool)
+
+        for key in dict.fromkeys(index_key(value) for value in values):
+            if key != MISSING_KEY and key in self.bitmaps[column]:
+                np.logical_or(mask, self.value_mask(column, key), out=mask)
+
+        return mask
+
+    def present(self, column: str) -> np.ndarray:
+        """
+        Rows with any (non-missing) value.
+        """
+        return self.mask(column, list(self.bitmaps[column]))
+
+
+# =====================================================
+# BUILD
+# =====================================================
+
+def indexable_columns(schema: List[dict]) -> List[dict]:
+    return [
+        col for col in schema or []
+        if col.get("type") in INDEXED_TYPES
+        and 0 < ((col.get("stats") or {}).get("distinct_count") or 0) <= INDEX_MAX_DISTINCT
+    ]
+
+
+def column_bitmaps(series: pd.Series, column_type: str) -> Optional[Dict[str, bytes]]:
+    """
+    Distinct value → compressed bitmap, over values compared the
+    same way the filter engine compares them.
+    """
+
+    values = convert_column(series, column_type)
+    codes, uniques = pd.factorize(values)
+
+    if len(uniques) > INDEX_MAX_DISTINCT:
+        return None
+
+    bitmaps: Dict[str, bytes] = {}
+
+    for code, value in enumerate(uniques):
+        key = index_key(value)
+        mask = codes == code
+
+        if key in bitmaps:
+            # 3 and 3.0 share a key
+            mask |= decompress_mask(bitmaps[key], len(codes))
+
+        bitmaps[key] = compress_mask(mask)
+
+    return bitmaps
+
+
+def build_bitmap_index(storage_path: str, schema: List[dict]) -> Optional[str]:
+    """
+    Index the low-cardinality columns of a dataset from its
+    columnar sidecar (one column in memory at a time). Returns the
+    index path, or None when nothing qualifies.
+    """
+
+    if not BITMAP_INDEX_ENABLED or not has_columnar_cache(storage_path):
+        return None
+
+    candidates = indexable_columns(schema)
+
+    if not candidates:
+        return None
+
+    names, values, bitmaps = [], [], []
+    row_count = None
+
+    for col in candidates:
+        name = normalize_column_name(col["name"])
+        frame = read_dataset_frame(storage_path, columns=[name])
+
+        if name not in frame.columns:
+            continue
+
+        row_count = len(frame)
+        column_index = column_bitmaps(frame[name], col["type"])
+
+        if column_index is None:
+            continue
+
+        for key, bitmap in column_index.items():
+            names.append(name)
+            values.append(key)
+            bitmaps.append(bitmap)
+
+    if row_count is None or not names:
+        return None
+
+    table = pa.table(
+        [names, values, bitmaps],
+        schema=INDEX_SCHEMA.with_metadata({ROW_COUNT_METADATA_KEY: str(row_count)})
+    )
+
+    path = index_path(storage_path)
+    tmp_path = path + ".tmp"
+
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    os.replace(tmp_path, path)
+
+    evict_bitmap_index(storage_path)
+
+    return path
+
+
+def try_build_bitmap_index(storage_path: str, schema: List[dict]):
+    """
+    Upload-time hook: the index is an optimization, never a reason
+    for an upload to fail.
+    """
+
+    try:
+        build_bitmap_index(storage_path, schema)
+    except Exception as e:
+        logger.warning("Bitmap index skipped for %s: %s", storage_path, e)
+
+
+# =====================================================
+# LOAD
+# =====================================================
+
+_loaded: "OrderedDict[tuple, BitmapIndex]" = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def load_bitmap_index(storage_path: str) -> Optional[BitmapIndex]:
+    """
+    Index for a dataset (None when it has none). Loaded indexes
+    are kept in a small LRU keyed by path + mtime.
+    """
+
+    if not storage_path:
+        return None
+
+    path = index_path(storage_path)
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    key = (path, mtime)
+
+    with _loaded_lock:
+        index = _loaded.get(key)
+
+        if index is not None:
+            _loaded.move_to_end(key)
+            return index
+
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    row_count = int((table.schema.metadata or {})[ROW_COUNT_METADATA_KEY])
+    bitmaps: Dict[str, Dict[str, bytes]] = {}
+
+    for name, value, bitmap in zip(
+        table.column("column").to_pylist(),
+        table.column("value").to_pylist(),
+        table.column("bitmap").to_pylist()
+    ):
+        bitmaps.setdefault(name, {})[value] = bitmap
+
+    index = BitmapIndex(row_count, bitmaps)
+
+    with _loaded_lock:
+        _loaded[key] = index
+
+        while len(_loaded) > INDEX_CACHE_SIZE:
+            _loaded.popitem(last=False)
+
+    return index
+
+
+def evict_bitmap_index(storage_path: str):
+    path = index_path(storage_path)
+
+    with _loaded_lock:
+        for key in [key for key in _loaded if key[0] == path]:
+            del _loaded[key]
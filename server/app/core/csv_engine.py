@@ -1,95 +1,101 @@
 # app/core/csv_engine.py
 
-import os
 import pandas as pd
-from typing import Dict, Any
+from typing import List, Optional, Iterator
 
 
 class CSVParseError(Exception):
     pass
 
 
-def parse_csv(file_path: str) -> Dict[str, Any]:
-    """
-    Safely parse CSV file.
-    Returns:
-        {
-            row_count,
-            schema,
-            sample_rows,
-            dataframe
-        }
-    """
+# DataFrame.attrs key naming where a frame was read from
+# ("csv" here, "columnar" for dataset sidecars)
+STORAGE_ATTR = "storage"
 
-    if not os.path.exists(file_path):
-        raise CSVParseError("CSV file not found.")
 
-    try:
-        df = pd.read_csv(file_path, dtype=str, encoding="utf-8")
-    except UnicodeDecodeError:
-        try:
-            df = pd.read_csv(file_path, dtype=str, encoding="latin1")
-        except Exception:
-            raise CSVParseError("Failed to read CSV file due to encoding issues.")
-    except Exception as e:
-        raise CSVParseError(f"CSV parsing failed: {str(e)}")
-
-    if df.empty:
-        raise CSVParseError("Uploaded CSV file is empty.")
-
-    # =====================================================
-    # Normalize Columns (OPTION A — SYSTEM WIDE STANDARD)
-    # =====================================================
-
-    df.columns = (
-        df.columns
-        .str.strip()
-        .str.lower()
+def normalize_header(value) -> str:
+    return (
+        str(value)
+        .replace("\ufeff", "")
+        .strip()
+        .lower()
     )
 
-    # Prevent case-collision duplicates
-    if len(df.columns) != len(set(df.columns)):
-        raise CSVParseError(
-            "CSV contains duplicate column names after normalization."
-        )
-
-    # Normalize cell values
-    df = df.fillna("")
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
 
-    row_count = len(df)
-
-    # =====================================================
-    # Schema Detection
-    # =====================================================
+def read_csv_frame(
+    source,
+    columns: Optional[List[str]] = None,
+    nrows: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Read CSV (path or file object) as text columns with
+    normalized headers. When `columns` is given, only those
+    (normalized) columns are parsed.
+    """
 
-    schema = []
+    usecols = None
 
-    for column in df.columns:
-        series = df[column]
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda name: normalize_header(name) in wanted
 
-        # If column fully empty
-        if series.eq("").all():
-            col_type = "string"
-        else:
-            # Attempt numeric detection
-            numeric_series = pd.to_numeric(series, errors="coerce")
+    for encoding in ("utf-8", "latin1"):
+        try:
+            if hasattr(source, "seek"):
+                source.seek(0)
+
+            df = pd.read_csv(
+                source,
+                dtype=str,
+                encoding=encoding,
+                usecols=usecols,
+                nrows=nrows
+            )
+            break
+        except UnicodeDecodeError:
+            continue
+        except Exception as e:
+            raise CSVParseError(f"CSV parsing failed: {str(e)}")
+    else:
+        raise CSVParseError("Failed to read CSV file due to encoding issues.")
+
+    df.columns = [normalize_header(col) for col in df.columns]
+    df.attrs[STORAGE_ATTR] = "csv"
+
+    return df
+
+
+def iter_csv_chunks(
+    file_path: str,
+    encoding: str = "utf-8",
+    chunksize: int = 100_000,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV in fixed-size row chunks (flat memory for large
+    files). Encoding must be known up front — a fallback half way
+    through would repeat rows.
+    """
 
-            # If most values numeric → treat as number
-            non_null_ratio = numeric_series.notna().sum() / len(series)
+    usecols = None
 
-            col_type = "number" if non_null_ratio > 0.9 else "string"
+    if columns is not None:
+        wanted = set(columns)
+        usecols = lambda name: normalize_header(name) in wanted
 
-        schema.append({
-            "name": column,
-            "type": col_type
-        })
+    try:
+        reader = pd.read_csv(
+            file_path,
+            dtype=str,
+            encoding=encoding,
+            usecols=usecols,
+            chunksize=chunksize
+        )
 
-    sample_rows = df.head(5).to_dict(orient="records")
+        with reader:
+            for chunk in reader:
+                chunk.columns = [normalize_header(col) for col in chunk.columns]
+                yield chunk
 
-    return {
-        "row_count": row_count,
-        "schema": schema,
-        "sample_rows": sample_rows,
-        "dataframe": df
-    }
\ No newline at end of file
+    except Exception as e:
+        raise CSVParseError(f"CSV parsing failed: {str(e)}")
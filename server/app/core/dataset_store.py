@@ -0,0 +1,620 @@
+# app/core/dataset_store.py
+
+import os
+import json
+import shutil
+import threading
+from typing import List, Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from app.core.csv_engine import read_csv_frame, iter_csv_chunks, STORAGE_ATTR
+from app.core.schema_engine import (
+    as_arrow,
+    present_cells,
+    trimmed_cells,
+    trimmed_text,
+    to_numbers,
+    text_kinds,
+    decide_type,
+    profile_column,
+    schema_types,
+    DETECTED_KINDS,
+    CATEGORY_MAX_DISTINCT,
+)
+from app.core.template_engine import format_value
+
+
+# =====================================================
+# Custom Exception
+# =====================================================
+
+class DatasetStoreError(Exception):
+    pass
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+COLUMNAR_EXTENSION = ".arrow"
+INDEX_EXTENSION = ".index.arrow"
+SCHEMA_METADATA_KEY = b"dataset_schema"
+
+
+# =====================================================
+# PATHS
+# =====================================================
+
+def columnar_path(storage_path: str) -> str:
+    """
+    Columnar sidecar lives next to the CSV:
+        temp_uploads/<id>.csv → temp_uploads/<id>.arrow
+    """
+    return os.path.splitext(storage_path)[0] + COLUMNAR_EXTENSION
+
+
+def has_columnar_cache(storage_path: str) -> bool:
+    return bool(storage_path) and os.path.exists(columnar_path(storage_path))
+
+
+def index_path(storage_path: str) -> str:
+    """
+    Bitmap index (optional) sits beside the sidecar:
+        temp_uploads/<id>.csv → temp_uploads/<id>.index.arrow
+    """
+    return os.path.splitext(storage_path)[0] + INDEX_EXTENSION
+
+
+# =====================================================
+# TYPED CONVERSION
+# =====================================================
+
+# Storage types → Arrow types (and back to pandas on read; dates →
+# datetime.date, timestamps → datetime64, dictionaries → Categorical)
+ARROW_TYPES = {
+    "Int64": pa.int64(),
+    "Float64": pa.float64(),
+    "boolean": pa.bool_(),
+    "date": pa.date32(),
+    "datetime": pa.timestamp("ns"),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+    "string": pa.string(),
+}
+
+PANDAS_TYPES = {
+    pa.int64(): pd.Int64Dtype(),
+    pa.float64(): pd.Float64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+# Raw distinct values kept per column while building (whitespace
+# variants included); beyond this a category column is stored as text
+CATEGORY_MAX_RAW_VALUES = CATEGORY_MAX_DISTINCT * 4
+
+# Canonical text of each date storage (what str() of a read-back
+# value gives) — only cells already in this form are stored typed
+CANONICAL_DATE_PATTERNS = {
+    "date": r"^\d{4}-\d{2}-\d{2}$",
+    "datetime": r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$",
+}
+
+
+def storage_type(series: pd.Series, col_type: str) -> str:
+    """
+    Pick how a raw text column is stored in the columnar cache.
+
+    Values are only stored typed when the conversion is lossless
+    (e.g. "+9198..." or "007" stay text, "yes" is not stored as
+    True), so rendering a typed cell gives back exactly what was
+    uploaded. Low-cardinality text is dictionary-encoded.
+    """
+
+    if col_type == "number":
+        return number_storage(series)
+
+    if col_type == "boolean":
+        return boolean_storage(series)
+
+    if col_type == "date":
+        return date_storage(series)
+
+    if col_type == "category":
+        return "category"
+
+    return "string"
+
+
+def number_storage(series: pd.Series) -> str:
+    cells = trimmed_cells(series)
+    present = pc.filter(cells, pc.not_equal(cells, ""))
+
+    values = to_numbers(present)
+
+    if values.null_count:
+        return "string"
+
+    numbers = values.to_numpy()
+    whole = (numbers % 1 == 0) & (np.abs(numbers) < 2 ** 53)
+
+    if whole.all():
+        rendered = pc.cast(pa.array(numbers.astype("int64")), pa.string())
+        typed = "Int64"
+    else:
+        # Whole floats render without ".0" (see template_engine.format_value)
+        text = pd.Series(numbers).astype(str)
+        text[whole] = pd.Series(numbers[whole]).astype("int64").astype(str).values
+        rendered = pa.array(text, type=pa.string())
+        typed = "Float64"
+
+    if pc.all(pc.equal(rendered, present)).as_py() is False:
+        return "string"
+
+    return typed
+
+
+def boolean_storage(series: pd.Series) -> str:
+    cells = trimmed_cells(series)
+    present = pc.filter(cells, pc.not_equal(cells, ""))
+
+    # Only "True"/"False" render back unchanged (format_value)
+    if pc.all(pc.is_in(present, value_set=pa.array(["True", "False"]))).as_py() is not False:
+        return "boolean"
+
+    return "category"
+
+
+def date_storage(series: pd.Series) -> str:
+    cells = trimmed_cells(series)
+    present = pc.filter(cells, pc.not_equal(cells, ""))
+
+    for storage, pattern in CANONICAL_DATE_PATTERNS.items():
+        canonical = pc.fill_null(pc.match_substring_regex(present, pattern), False)
+
+        if pc.all(canonical).as_py() is not False:
+            break
+    else:
+        return "string"
+
+    # Canonical shape — calendar values must also be real
+    values = pd.to_datetime(present.to_pandas(), format="ISO8601", errors="coerce")
+
+    if values.isna().any():
+        return "string"
+
+    return storage
+
+
+def merge_storage_types(current: Optional[str], new: str) -> str:
+    """
+    Combine per-chunk decisions (Int64 + Float64 → Float64,
+    boolean + category → category, anything else mixed → string).
+    """
+    if current is None or current == new:
+        return new
+
+    pair = {current, new}
+
+    if pair == {"Int64", "Float64"}:
+        return "Float64"
+
+    if pair == {"boolean", "category"}:
+        return "category"
+
+    return "string"
+
+
+def cast_series(
+    series: pd.Series,
+    storage: str,
+    categories: Optional[List[str]] = None
+) -> pd.Series:
+    if storage == "string":
+        return series.fillna("").astype(str)
+
+    if storage == "category":
+        text = series.fillna("").astype(str)
+        # Fixed categories keep one dictionary across record batches;
+        # blank cells are left out of it and stored as null
+        if categories is None:
+            categories = sorted(set(text.unique()) - {""})
+        return pd.Series(
+            pd.Categorical(text, categories=categories),
+            index=series.index
+        )
+
+    stripped = trimmed_text(series)
+
+    if storage == "boolean":
+        return stripped.map({"True": True, "False": False}).astype("boolean")
+
+    if storage in ("date", "datetime"):
+        return pd.to_datetime(
+            stripped.where(stripped != ""),
+            format="ISO8601",
+            errors="coerce"
+        )
+
+    numeric = pd.to_numeric(stripped.where(stripped != ""), errors="coerce")
+
+    if storage == "Int64":
+        return numeric.round().astype("Int64")
+
+    return numeric.astype("Float64")
+
+
+def cast_frame(
+    df: pd.DataFrame,
+    storage: Dict[str, str],
+    categories: Optional[Dict[str, List[str]]] = None
+) -> pd.DataFrame:
+    categories = categories or {}
+
+    return pd.DataFrame(
+        {
+            column: cast_series(
+                df[column],
+                storage.get(column, "string"),
+                categories.get(column)
+            )
+            for column in df.columns
+        },
+        index=df.index
+    )
+
+
+def arrow_schema(storage: Dict[str, str], schema: List[dict]) -> pa.Schema:
+    return pa.schema(
+        [pa.field(column, ARROW_TYPES[kind]) for column, kind in storage.items()],
+        metadata={SCHEMA_METADATA_KEY: json.dumps(schema).encode("utf-8")}
+    )
+
+
+# =====================================================
+# WRITE
+# =====================================================
+
+def write_batches(
+    storage_path: str,
+    target_schema: pa.Schema,
+    frames: Iterable[pd.DataFrame]
+) -> str:
+    """
+    Write typed columnar sidecar (Arrow IPC, uncompressed so reads
+    can be memory-mapped). Written to a temp file first and swapped
+    in atomically.
+    """
+
+    destination = columnar_path(storage_path)
+    partial = destination + ".partial"
+
+    try:
+        with pa.OSFile(partial, "wb") as sink:
+            with pa.ipc.new_file(sink, target_schema) as writer:
+                for frame in frames:
+                    writer.write_batch(
+                        pa.RecordBatch.from_pandas(
+                            frame[target_schema.names],
+                            schema=target_schema,
+                            preserve_index=False
+                        )
+                    )
+
+        os.replace(partial, destination)
+
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise DatasetStoreError(f"Failed to write columnar cache: {str(e)}")
+
+    return destination
+
+
+def write_columnar_cache(
+    df: pd.DataFrame,
+    schema: List[dict],
+    storage_path: str
+) -> str:
+    """
+    Write the sidecar for a DataFrame already in memory.
+    """
+
+    types = schema_types(schema)
+
+    storage = {
+        column: storage_type(df[column], types.get(column, "string"))
+        for column in df.columns
+    }
+
+    return write_batches(
+        storage_path,
+        arrow_schema(storage, schema),
+        [cast_frame(df, storage)]
+    )
+
+
+def new_column_state() -> Dict[str, Any]:
+    return {
+        "kinds": {kind: True for kind in DETECTED_KINDS},
+        "storage": {},
+        "present": 0,
+        "distinct": set(),
+        "raw": set(),
+        "overflow": False,
+    }
+
+
+def update_column_state(state: Dict[str, Any], raw: pd.Series):
+    """
+    Fold one chunk into a column's running inference state.
+    """
+
+    cells = as_arrow(raw)
+    present = present_cells(cells)
+    state["present"] += len(present)
+
+    if not state["overflow"]:
+        state["distinct"].update(pc.unique(present).to_pylist())
+        state["raw"].update(pc.unique(pc.fill_null(cells, "")).to_pylist())
+
+        if (
+            len(state["distinct"]) > CATEGORY_MAX_DISTINCT
+            or len(state["raw"]) > CATEGORY_MAX_RAW_VALUES
+        ):
+            state["overflow"] = True
+            state["distinct"].clear()
+            state["raw"].clear()
+
+    candidates = [kind for kind, ok in state["kinds"].items() if ok]
+
+    if not len(present) or not candidates:
+        return
+
+    kinds = text_kinds(present, candidates)
+
+    for kind in candidates:
+        if not kinds[kind]:
+            state["kinds"][kind] = False
+            continue
+
+        state["storage"][kind] = merge_storage_types(
+            state["storage"].get(kind),
+            storage_type(raw, kind)
+        )
+
+
+def resolve_column_state(state: Dict[str, Any]):
+    """
+    Final (type, storage, categories) for a column.
+    """
+
+    kinds = state["kinds"] if state["present"] else {}
+    distinct = CATEGORY_MAX_DISTINCT + 1 if state["overflow"] else len(state["distinct"])
+
+    col_type = decide_type(kinds, distinct, state["present"])
+
+    if col_type in DETECTED_KINDS:
+        storage = state["storage"].get(col_type) or "string"
+    else:
+        storage = "category" if col_type == "category" else "string"
+
+    categories = sorted(state["raw"] - {""}) if storage == "category" else None
+
+    if storage == "category" and not categories:
+        # Lossy boolean whose raw values overflowed the bound
+        storage = "string"
+
+    return col_type, storage, categories
+
+
+def build_columnar_cache(
+    storage_path: str,
+    schema: List[dict],
+    encoding: str = "utf-8",
+    chunksize: int = 100_000
+) -> Dict[str, Any]:
+    """
+    Build the sidecar from the CSV on disk in bounded memory.
+
+    Pass 1 applies the schema_engine type rules over every row
+    (the sample-inferred schema is only a hint), collects category
+    dictionaries and counts rows. Pass 2 writes typed record
+    batches. Column stats are then profiled from the sidecar, one
+    memory-mapped column at a time.
+
+    Returns:
+        {
+            schema,
+            row_count
+        }
+    """
+
+    states: Dict[str, Dict[str, Any]] = {}
+    row_count = 0
+
+    for chunk in iter_csv_chunks(storage_path, encoding=encoding, chunksize=chunksize):
+        row_count += len(chunk)
+
+        for column in chunk.columns:
+            update_column_state(
+                states.setdefault(column, new_column_state()),
+                chunk[column]
+            )
+
+    if not states:
+        # Header-only file → no chunks; keep the columns anyway
+        states = {name: new_column_state() for name in schema_types(schema)}
+
+    types: Dict[str, str] = {}
+    storage: Dict[str, str] = {}
+    categories: Dict[str, List[str]] = {}
+
+    for column, state in states.items():
+        types[column], storage[column], values = resolve_column_state(state)
+
+        if values is not None:
+            categories[column] = values
+
+    write_batches(
+        storage_path,
+        arrow_schema(storage, [{"name": c, "type": t} for c, t in types.items()]),
+        (
+            cast_frame(chunk, storage, categories)
+            for chunk in iter_csv_chunks(storage_path, encoding=encoding, chunksize=chunksize)
+        )
+    )
+
+    path = columnar_path(storage_path)
+
+    confirmed = [
+        profile_column(
+            column,
+            feather.read_table(path, columns=[column], memory_map=True).column(0)
+        )
+        for column in types
+    ]
+
+    return {
+        "schema": confirmed,
+        "row_count": row_count
+    }
+
+
+# =====================================================
+# BUILD TRACKING
+# =====================================================
+
+# storage_path -> set once the background build is done
+_pending_builds: Dict[str, threading.Event] = {}
+_pending_lock = threading.Lock()
+
+
+def mark_build_pending(storage_path: str):
+    with _pending_lock:
+        _pending_builds[storage_path] = threading.Event()
+
+
+def finish_build(storage_path: str):
+    with _pending_lock:
+        done = _pending_builds.pop(storage_path, None)
+
+    if done:
+        done.set()
+
+
+def wait_for_build(storage_path: str, timeout: float = 300) -> bool:
+    """
+    Block until a pending build of storage_path finishes, so files
+    are never moved out from under the builder.
+    """
+
+    with _pending_lock:
+        done = _pending_builds.get(storage_path)
+
+    return done.wait(timeout) if done else True
+
+
+# =====================================================
+# READ
+# =====================================================
+
+def read_columnar_schema(storage_path: str) -> Optional[List[dict]]:
+    """
+    Schema stored in the sidecar metadata (no column data is read).
+    """
+
+    if not has_columnar_cache(storage_path):
+        return None
+
+    with pa.memory_map(columnar_path(storage_path)) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+
+    raw = metadata.get(SCHEMA_METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def read_dataset_frame(
+    storage_path: str,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Load a dataset, projecting only the requested columns.
+
+    Uses the memory-mapped columnar sidecar when present and
+    falls back to parsing the CSV otherwise. Unknown columns are
+    ignored here — compatibility validation reports them.
+    """
+
+    if has_columnar_cache(storage_path):
+        path = columnar_path(storage_path)
+
+        if columns is not None:
+            with pa.memory_map(path) as source:
+                available = set(pa.ipc.open_file(source).schema.names)
+            columns = [c for c in dict.fromkeys(columns) if c in available]
+
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        df = table.to_pandas(types_mapper=PANDAS_TYPES.get)
+        df.attrs[STORAGE_ATTR] = "columnar"
+        return df
+
+    if not storage_path or not os.path.exists(storage_path):
+        raise DatasetStoreError("Dataset file not found.")
+
+    return read_csv_frame(storage_path, columns=columns)
+
+
+def read_dataset_head(storage_path: str, n: int = 10) -> pd.DataFrame:
+    """
+    First n rows for previews — reads a single record batch
+    instead of the whole sidecar.
+    """
+
+    if has_columnar_cache(storage_path):
+        with pa.memory_map(columnar_path(storage_path)) as source:
+            reader = pa.ipc.open_file(source)
+
+            if reader.num_record_batches == 0:
+                table = reader.schema.empty_table()
+            else:
+                table = pa.Table.from_batches([reader.get_batch(0).slice(0, n)])
+
+            return table.to_pandas(types_mapper=PANDAS_TYPES.get)
+
+    return read_csv_frame(storage_path, nrows=n)
+
+
+def to_display_records(df: pd.DataFrame) -> List[dict]:
+    """
+    Rows as text, exactly as uploaded (previews / API output).
+    """
+    return [
+        {column: format_value(value) for column, value in row.items()}
+        for row in df.to_dict(orient="records")
+    ]
+
+
+def delete_dataset_files(storage_path: str):
+    if not storage_path:
+        return
+
+    for path in (storage_path, columnar_path(storage_path), index_path(storage_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def move_dataset_files(source_path: str, destination_path: str):
+    """
+    Move the CSV and (if present) its columnar sidecar and bitmap
+    index together.
+    """
+
+    shutil.move(source_path, destination_path)
+
+    for path_of in (columnar_path, index_path):
+        if os.path.exists(path_of(source_path)):
+            shutil.move(path_of(source_path), path_of(destination_path))
@@ -3,6 +3,14 @@
 from typing import Tuple, List, Dict
 import difflib
 
+from app.core.filter_engine import (
+    operator_allowed,
+    expected_column_types,
+    validate_condition_value,
+    iter_conditions,
+    FilterValidationError,
+)
+
 
 # =====================================================
 # Custom Exception
@@ -57,11 +65,10 @@ def suggest_column_name(column: str, available_columns: List[str]) -> str:
 
 def validate_operator_datatype(column_type: str, operator: str) -> bool:
     """
-    Numeric operators only allowed for numeric columns.
+    Ordering operators need number / date columns, date-range
+    operators need date columns, 'contains' needs text.
     """
-    if operator in ["<", ">", "<=", ">="] and column_type != "number":
-        return False
-    return True
+    return operator_allowed(operator, column_type)
 
 
 # =====================================================
@@ -138,9 +145,8 @@ def validate_dataset_compatibility(
     # =====================================================
 
     if template.filter_dsl:
-        conditions = template.filter_dsl.get("conditions", [])
-
-        for cond in conditions:
+        # Every leaf condition, including nested groups
+        for cond in iter_conditions(template.filter_dsl):
             raw_column = cond.get("column")
             operator = cond.get("operator")
 
@@ -166,9 +172,21 @@ def validate_dataset_compatibility(
                     "type": "datatype_mismatch",
                     "column": raw_column,
                     "operator": operator,
-                    "expected": "number",
+                    "expected": expected_column_types(operator),
                     "found": column_type,
-                    "message": f"Operator '{operator}' requires numeric column for '{raw_column}'."
+                    "message": f"Operator '{operator}' requires a {expected_column_types(operator)} column for '{raw_column}'."
+                })
+                continue
+
+            # Value compatibility (dates, ranges, day counts)
+            try:
+                validate_condition_value(column_type, operator, cond.get("value"), raw_column)
+            except FilterValidationError as e:
+                errors.append({
+                    "type": "invalid_filter_value",
+                    "column": raw_column,
+                    "operator": operator,
+                    "message": str(e)
                 })
 
     # =====================================================
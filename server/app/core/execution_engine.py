@@ -5,6 +5,7 @@ import time
 import os
 import pandas as pd
 from datetime import datetime
+from typing import List
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -14,10 +15,17 @@ from app.models.db_models import (
     CampaignTemplate,
     ChannelIntegration,
     ExecutionLog,
+    Dataset,
 )
-from app.core.filter_engine import apply_filter
-from app.core.template_engine import render_template
+from app.core.filter_cache import apply_filter_cached
+from app.core.analytics_rollup import record_log_rollup
+from app.core.response_cache import bump_analytics_version
+from app.core.bitmap_index import load_bitmap_index
+from app.core.filter_engine import iter_conditions
+from app.core.template_engine import render_template, format_value, extract_variables
 from app.core.dataset_validator import validate_dataset_compatibility
+from app.core.dataset_store import read_dataset_frame, delete_dataset_files
+from app.core.schema_engine import infer_schema, schema_cache, file_checksum
 from app.channels.factory import get_channel
 from app.core.progress_manager import progress_manager
 
@@ -62,6 +70,49 @@ def normalize_column(value: str) -> str:
     return str(value).replace("\ufeff", "").strip().lower()
 
 
+def required_columns(template: CampaignTemplate, recipient_column: str) -> List[str]:
+    """
+    The only columns a run reads: recipient, template variables
+    and filter columns (normalized, in that order).
+    """
+
+    variables = template.variables or extract_variables(template.template)
+    columns = [recipient_column] + [normalize_column(var) for var in variables]
+
+    if template.filter_dsl:
+        columns += [
+            normalize_column(cond.get("column"))
+            for cond in iter_conditions(template.filter_dsl)
+        ]
+
+    return list(dict.fromkeys(column for column in columns if column))
+
+
+def execution_dataset_info(db: Session, execution: CampaignExecution, df: pd.DataFrame):
+    """
+    (schema, content checksum) for the rows being sent.
+
+    Stored datasets carry both; uploads are hashed here and get
+    their schema from the schema engine cache (already filled by
+    /validate for this file). df is a column projection, so a
+    schema inferred from it is used for this run but not cached.
+    """
+
+    if execution.dataset_id:
+        dataset = db.query(Dataset).filter(
+            Dataset.id == execution.dataset_id
+        ).first()
+
+        if dataset and dataset.schema:
+            return dataset.schema, dataset.checksum or file_checksum(execution.file_path)
+
+    checksum = file_checksum(execution.file_path)
+
+    schema = schema_cache.get(checksum) or infer_schema(df)
+
+    return schema, checksum
+
+
 # =====================================================
 # SAFE ENTRY POINT
 # =====================================================
@@ -89,7 +140,7 @@ async def process_row(
     last_error = None
     rendered_message = None
 
-    recipient_value = row_dict.get(recipient_column)
+    recipient_value = format_value(row_dict.get(recipient_column))
 
     if not recipient_value:
         return {
@@ -162,6 +213,7 @@ async def execute_campaign(execution_id: int):
         execution.status = "running"
         execution.started_at = datetime.utcnow()
         db.commit()
+        bump_analytics_version(execution.organization_id)
 
         template = db.query(CampaignTemplate).filter(
             CampaignTemplate.id == execution.campaign_template_id
@@ -175,18 +227,32 @@ async def execute_campaign(execution_id: int):
         if not template or not integration:
             raise Exception("Missing template or integration.")
 
-        df = pd.read_csv(execution.file_path, dtype=str)
-
-        df.columns = df.columns.str.strip().str.lower()
-
         recipient_column = normalize_column(execution.recipient_column)
 
-        filtered_df = apply_filter(
-            df,
-            template.filter_dsl or {},
-            []
+        # Only the columns this run uses — from the columnar sidecar
+        # when available, CSV (usecols) otherwise
+        df = read_dataset_frame(
+            execution.file_path,
+            columns=required_columns(template, recipient_column)
         )
 
+        if template.filter_dsl:
+            schema, checksum = execution_dataset_info(db, execution, df)
+
+            # Stored datasets may carry a bitmap index for ==/in filters
+            index = load_bitmap_index(execution.file_path) if execution.dataset_id else None
+
+            # Cached bitmap when /validate already filtered this content
+            filtered_df = apply_filter_cached(
+                df,
+                template.filter_dsl,
+                schema,
+                checksum,
+                index
+            )
+        else:
+            filtered_df = df
+
         records = filtered_df.to_dict(orient="records")
 
         execution.total_count = len(records)
@@ -194,6 +260,7 @@ async def execute_campaign(execution_id: int):
         execution.success_count = 0
         execution.failure_count = 0
         db.commit()
+        bump_analytics_version(execution.organization_id)
 
         channel = get_channel(integration.channel_type, integration)
         rate_limiter = AsyncRateLimiter(
@@ -226,7 +293,9 @@ async def execute_campaign(execution_id: int):
                     provider_response_message=result["error"],
                     retry_count=result["retry_count"],
                     is_retried=result["retry_count"] > 0,
-                    sent_at=datetime.utcnow() if result["success"] else None
+                    sent_at=datetime.utcnow() if result["success"] else None,
+                    # Set here so the rollup buckets by the same day
+                    created_at=datetime.utcnow()
                 )
             )
 
@@ -241,10 +310,16 @@ async def execute_campaign(execution_id: int):
             if idx % LOG_BATCH_SIZE == 0 or idx == len(records):
 
                 db.bulk_save_objects(log_batch)
+
+                # Same transaction as the logs
+                record_log_rollup(db, execution, log_batch)
                 log_batch.clear()
 
                 db.commit()
 
+                # Cached dashboards of this org are now stale
+                bump_analytics_version(execution.organization_id)
+
                 # Broadcast AFTER commit (important)
                 await progress_manager.broadcast(
                     execution.id,
@@ -268,6 +343,7 @@ async def execute_campaign(execution_id: int):
         )
 
         db.commit()
+        bump_analytics_version(execution.organization_id)
 
         await progress_manager.broadcast(
             execution.id,
@@ -287,6 +363,7 @@ async def execute_campaign(execution_id: int):
             execution.status = "failed"
             execution.failure_reason = str(e)
             db.commit()
+            bump_analytics_version(execution.organization_id)
 
             await progress_manager.broadcast(
                 execution.id,
@@ -299,8 +376,9 @@ async def execute_campaign(execution_id: int):
     finally:
 
         try:
-            if execution and execution.file_path and os.path.exists(execution.file_path):
-                os.remove(execution.file_path)
+            # Stored datasets are reused across runs — only uploads go
+            if execution and execution.file_path and not execution.dataset_id:
+                delete_dataset_files(execution.file_path)
         except Exception:
             pass
 
@@ -0,0 +1,212 @@
+# app/core/filter_cache.py
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.csv_engine import STORAGE_ATTR
+from app.core.filter_engine import (
+    compile_filter,
+    iter_conditions,
+    normalize_column_name,
+    RELATIVE_DATE_OPERATORS,
+)
+from app.core.schema_engine import schema_types
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+FILTER_CACHE_MAX_ENTRIES = int(os.getenv("FILTER_CACHE_MAX_ENTRIES", "1024"))
+FILTER_CACHE_MAX_BYTES = int(os.getenv("FILTER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+# =====================================================
+# BITMAPS
+# =====================================================
+
+def pack_mask(mask: np.ndarray) -> bytes:
+    """
+    Boolean row mask → bitmap (1 bit per row).
+    """
+    return np.packbits(mask).tobytes()
+
+
+def unpack_mask(bitmap: bytes, row_count: int) -> np.ndarray:
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), count=row_count)
+    return bits.astype(bool)
+
+
+# =====================================================
+# KEYS
+# =====================================================
+
+def canonical_filter(node):
+    """
+    Filter DSL with normalized column names, so cosmetic
+    differences ("City " vs "city") share a cache entry.
+    """
+
+    if isinstance(node, list):
+        return [canonical_filter(item) for item in node]
+
+    if not isinstance(node, dict):
+        return node
+
+    return {
+        key: normalize_column_name(value) if key == "column" else canonical_filter(value)
+        for key, value in node.items()
+    }
+
+
+def filter_hash(filter_dsl: Dict, schema: List[dict], storage: str = "csv") -> str:
+    """
+    Hash of the normalized DSL + the column types and storage form
+    (CSV text or typed sidecar) it is evaluated with. Relative date
+    filters ("within last N days") also hash today's date, so
+    results never outlive the day they cover.
+    """
+
+    payload = {
+        "filter": canonical_filter(filter_dsl),
+        "types": schema_types(schema),
+        "storage": storage,
+    }
+
+    if any(
+        cond.get("operator") in RELATIVE_DATE_OPERATORS
+        for cond in iter_conditions(filter_dsl)
+    ):
+        payload["day"] = datetime.utcnow().date().isoformat()
+
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# CACHE
+# =====================================================
+
+class FilterResultCache:
+    """
+    Bounded LRU of filter results as row bitmaps, keyed by
+    (dataset content checksum, filter hash). Bounded both by entry
+    count and by total bitmap bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = FILTER_CACHE_MAX_ENTRIES,
+        max_bytes: int = FILTER_CACHE_MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[int, bytes]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, checksum: str, key: str, row_count: int) -> Optional[np.ndarray]:
+        if not checksum:
+            return None
+
+        with self.lock:
+            entry = self.entries.get((checksum, key))
+
+            if entry is None:
+                return None
+
+            self.entries.move_to_end((checksum, key))
+
+        cached_rows, bitmap = entry
+
+        # Same content always has the same rows; guard anyway
+        if cached_rows != row_count:
+            return None
+
+        return unpack_mask(bitmap, row_count)
+
+    def put(self, checksum: str, key: str, mask: np.ndarray):
+        if not checksum:
+            return
+
+        bitmap = pack_mask(mask)
+
+        if len(bitmap) > self.max_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop((checksum, key), None)
+
+            if previous is not None:
+                self.total_bytes -= len(previous[1])
+
+            self.entries[(checksum, key)] = (len(mask), bitmap)
+            self.total_bytes += len(bitmap)
+
+            while (
+                len(self.entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+            }
+
+
+# Singleton instance
+filter_cache = FilterResultCache()
+
+
+# =====================================================
+# CACHED FILTERING
+# =====================================================
+
+def filter_mask(
+    df: pd.DataFrame,
+    filter_dsl: Dict,
+    schema: List[dict],
+    checksum: Optional[str],
+    index=None
+) -> Optional[np.ndarray]:
+    """
+    Row mask for filter_dsl over df (None when there is no filter).
+    Served from the cache when this content was already filtered
+    with the same DSL — e.g. /validate followed by the run. `index`
+    is the dataset's bitmap index, when it has one.
+    """
+
+    if not filter_dsl:
+        return None
+
+    key = filter_hash(filter_dsl, schema, df.attrs.get(STORAGE_ATTR, "csv"))
+    mask = filter_cache.get(checksum, key, len(df))
+
+    if mask is None:
+        mask = compile_filter(filter_dsl, schema).evaluate(df, index)
+        filter_cache.put(checksum, key, mask)
+
+    return mask
+
+
+def apply_filter_cached(
+    df: pd.DataFrame,
+    filter_dsl: Dict,
+    schema: List[dict],
+    checksum: Optional[str],
+    index=None
+) -> pd.DataFrame:
+    mask = filter_mask(df, filter_dsl, schema, checksum, index)
+    return df if mask is None else df[mask]
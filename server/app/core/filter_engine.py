@@ -1,6 +1,19 @@
+import re
+import numpy as np
 import pandas as pd
-from typing import List, Dict
-from functools import reduce
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import List, Dict, Optional
+
+from app.core.schema_engine import (
+    to_dates,
+    to_booleans,
+    parse_date_value,
+    parse_boolean_value,
+    ORDERED_TYPES,
+    TEXT_TYPES,
+)
+from app.core.template_engine import format_value
 
 
 # =====================================================
@@ -40,7 +53,8 @@ def normalize_schema(schema: List[dict]) -> Dict[str, str]:
     Converts schema list into normalized dictionary:
     {
         "attendance": "number",
-        "rollno": "string"
+        "rollno": "string",
+        "signup_date": "date"
     }
     """
 
@@ -61,15 +75,335 @@ def normalize_schema(schema: List[dict]) -> Dict[str, str]:
     return schema_map
 
 
+# =====================================================
+# OPERATORS
+# =====================================================
+
+COMPARISON_OPERATORS = ["==", "<", ">", "<=", ">="]
+TEXT_OPERATORS = ["contains"]
+
+# Value is a list, matched with one hashed lookup per row
+SET_OPERATORS = ["in", "not_in"]
+
+# Text prefix / suffix / anchored regex (re.match semantics)
+PATTERN_OPERATORS = ["startswith", "endswith", "regex"]
+
+# Date ranges ("YYYY-MM-DD" bounds cover the whole day)
+DATE_OPERATORS = ["before", "after", "between"]
+
+# Value is a number of days, relative to today (UTC)
+RELATIVE_DATE_OPERATORS = ["within_last_days", "older_than_days"]
+
+ALLOWED_OPERATORS = (
+    COMPARISON_OPERATORS
+    + TEXT_OPERATORS
+    + SET_OPERATORS
+    + PATTERN_OPERATORS
+    + DATE_OPERATORS
+    + RELATIVE_DATE_OPERATORS
+)
+
+# Operators matched against a cell's text. On date / boolean
+# columns they see the value as uploaded (e.g. "2024" in a date)
+TEXT_MATCH_OPERATORS = TEXT_OPERATORS + PATTERN_OPERATORS
+TEXT_MATCH_TYPES = TEXT_TYPES + ("date", "boolean")
+
+# Operand size limits
+MAX_SET_VALUES = 10_000
+MAX_PATTERN_LENGTH = 256
+
+# Column types each operator accepts (missing → any type)
+OPERATOR_COLUMN_TYPES = {
+    "<": ORDERED_TYPES,
+    ">": ORDERED_TYPES,
+    "<=": ORDERED_TYPES,
+    ">=": ORDERED_TYPES,
+    "between": ORDERED_TYPES,
+    "contains": TEXT_MATCH_TYPES,
+    "startswith": TEXT_MATCH_TYPES,
+    "endswith": TEXT_MATCH_TYPES,
+    "regex": TEXT_MATCH_TYPES,
+    "before": ("date",),
+    "after": ("date",),
+    "within_last_days": ("date",),
+    "older_than_days": ("date",),
+}
+
+
+def operator_allowed(operator: str, column_type: str) -> bool:
+    expected = OPERATOR_COLUMN_TYPES.get(operator)
+    return expected is None or column_type in expected
+
+
+def expected_column_types(operator: str) -> str:
+    return " or ".join(OPERATOR_COLUMN_TYPES.get(operator, ("any",)))
+
+
+def match_type(operator: str, column_type: str) -> str:
+    """
+    Type a condition is evaluated as — text operators on a typed
+    column compare its text form.
+    """
+
+    if operator in TEXT_MATCH_OPERATORS and column_type not in TEXT_TYPES:
+        return "string"
+
+    return column_type
+
+
+def parse_operand(column_type: str, value):
+    """
+    Filter value → comparable scalar for the column type
+    (raises ValueError / TypeError).
+    """
+
+    if column_type == "number":
+        return float(value)
+
+    if column_type == "date":
+        return parse_date_value(value)
+
+    if column_type == "boolean":
+        return parse_boolean_value(value)
+
+    return str(value)
+
+
+def parse_days(value) -> float:
+    if isinstance(value, bool):
+        raise ValueError("Days must be a number")
+
+    days = float(value)
+
+    if days < 0:
+        raise ValueError("Days must not be negative")
+
+    return days
+
+
+def is_date_only(value) -> bool:
+    return ":" not in str(value) and "T" not in str(value).upper()
+
+
+def date_range(operator: str, value):
+    """
+    Date operator → half-open [start, end) range (None = open).
+    """
+
+    def start_of(bound):
+        return parse_date_value(bound)
+
+    def end_of(bound):
+        stamp = parse_date_value(bound)
+        if is_date_only(bound):
+            return stamp + pd.Timedelta(days=1)
+        return stamp + pd.Timedelta(1, unit="ns")
+
+    if operator == "before":
+        return None, start_of(value)
+
+    if operator == "after":
+        return end_of(value), None
+
+    if operator == "between":
+        return start_of(value[0]), end_of(value[1])
+
+    today = pd.Timestamp.now(tz="UTC").tz_localize(None).normalize()
+    cutoff = today - pd.Timedelta(days=parse_days(value))
+
+    if operator == "within_last_days":
+        return cutoff, today + pd.Timedelta(days=1)
+
+    # older_than_days
+    return None, cutoff
+
+
+def validate_condition_value(column_type: str, operator: str, value, raw_column: str):
+    """
+    Check a condition's value against its operator and column type.
+    """
+
+    if operator in RELATIVE_DATE_OPERATORS:
+        try:
+            parse_days(value)
+        except (ValueError, TypeError):
+            raise FilterValidationError(
+                f"Operator '{operator}' on '{raw_column}' expects a non-negative number of days."
+            )
+        return
+
+    if operator in PATTERN_OPERATORS:
+        if not isinstance(value, str) or not value:
+            raise FilterValidationError(
+                f"Operator '{operator}' on '{raw_column}' expects a non-empty string."
+            )
+
+        if len(value) > MAX_PATTERN_LENGTH:
+            raise FilterValidationError(
+                f"Operator '{operator}' on '{raw_column}' value exceeds {MAX_PATTERN_LENGTH} characters."
+            )
+
+        if operator == "regex":
+            # Must compile for both engines: Python re (categories)
+            # and RE2 via Arrow (linear time, no backtracking)
+            try:
+                re.compile(value)
+                pc.match_substring_regex(pa.array([""]), value)
+            except (re.error, pa.ArrowInvalid) as e:
+                raise FilterValidationError(
+                    f"Invalid regex for '{raw_column}': {str(e)}"
+                )
+        return
+
+    if operator in SET_OPERATORS:
+        if not isinstance(value, (list, tuple)) or len(value) == 0:
+            raise FilterValidationError(
+                f"Operator '{operator}' on '{raw_column}' expects a non-empty list."
+            )
+
+        if len(value) > MAX_SET_VALUES:
+            raise FilterValidationError(
+                f"Operator '{operator}' on '{raw_column}' allows at most {MAX_SET_VALUES} values."
+            )
+        operands = list(value)
+
+    elif operator == "between":
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise FilterValidationError(
+                f"Operator 'between' on '{raw_column}' expects [start, end]."
+            )
+        operands = list(value)
+    else:
+        operands = [value]
+
+    parsed = []
+
+    for operand in operands:
+        try:
+            parsed.append(parse_operand(match_type(operator, column_type), operand))
+        except (ValueError, TypeError):
+            if column_type == "number":
+                message = f"Column '{raw_column}' expects a numeric value."
+            elif column_type == "date":
+                message = f"Column '{raw_column}' expects a date value (YYYY-MM-DD)."
+            elif column_type == "boolean":
+                message = f"Column '{raw_column}' expects true or false."
+            else:
+                message = f"Invalid value for column '{raw_column}'."
+            raise FilterValidationError(message)
+
+    if operator == "between" and parsed[0] > parsed[1]:
+        raise FilterValidationError(
+            f"Operator 'between' on '{raw_column}' has start after end."
+        )
+
+
 # =====================================================
 # FILTER DSL VALIDATION
 # =====================================================
 
+# Nesting / size guards for a single filter
+MAX_FILTER_DEPTH = 5
+MAX_FILTER_CONDITIONS = 100
+
+
+def is_group(node: dict) -> bool:
+    return "conditions" in node or "logic" in node
+
+
+def iter_conditions(node):
+    """
+    Leaf conditions of a (possibly nested) filter, depth first.
+    """
+
+    if not isinstance(node, dict):
+        return
+
+    if "not" in node:
+        yield from iter_conditions(node["not"])
+    elif is_group(node):
+        for child in node.get("conditions") or []:
+            yield from iter_conditions(child)
+    else:
+        yield node
+
+
+def validate_condition(condition: dict, schema_map: Dict[str, str]):
+
+    raw_column = condition.get("column")
+    operator = condition.get("operator")
+    value = condition.get("value")
+
+    column = normalize_column_name(raw_column)
+
+    if not column:
+        raise FilterValidationError("Condition missing 'column'.")
+
+    if column not in schema_map:
+        raise FilterValidationError(f"Invalid column '{raw_column}'.")
+
+    if operator not in ALLOWED_OPERATORS:
+        raise FilterValidationError(
+            f"Invalid operator '{operator}'. Allowed operators: {ALLOWED_OPERATORS}"
+        )
+
+    if value is None:
+        raise FilterValidationError(
+            f"Condition for column '{raw_column}' must include a value."
+        )
+
+    column_type = schema_map[column]
+
+    if not operator_allowed(operator, column_type):
+        raise FilterValidationError(
+            f"Operator '{operator}' not allowed for {column_type} column '{raw_column}'."
+        )
+
+    # Type validation
+    validate_condition_value(column_type, operator, value, raw_column)
+
+
+def validate_filter_node(node, schema_map: Dict[str, str], depth: int) -> int:
+    """
+    Validate one node (group / NOT / condition); returns the number
+    of leaf conditions under it.
+    """
+
+    if not isinstance(node, dict):
+        raise FilterValidationError("Each condition must be an object.")
+
+    if depth > MAX_FILTER_DEPTH:
+        raise FilterValidationError(
+            f"Filter groups can be nested at most {MAX_FILTER_DEPTH} levels deep."
+        )
+
+    if "not" in node:
+        return validate_filter_node(node["not"], schema_map, depth + 1)
+
+    if not is_group(node):
+        validate_condition(node, schema_map)
+        return 1
+
+    logic = node.get("logic")
+    conditions = node.get("conditions")
+
+    if logic not in ["AND", "OR"]:
+        raise FilterValidationError("Filter logic must be 'AND' or 'OR'.")
+
+    if not isinstance(conditions, list) or len(conditions) == 0:
+        raise FilterValidationError("Filter must contain at least one condition.")
+
+    return sum(
+        validate_filter_node(child, schema_map, depth + 1)
+        for child in conditions
+    )
+
+
 def validate_filter_dsl(filter_dsl: dict, schema: List[dict]) -> bool:
     """
     Validates filter DSL against dataset schema.
 
-    Expected format:
+    Expected format (groups nest; {"not": ...} negates a node):
     {
         "logic": "AND" | "OR",
         "conditions": [
@@ -77,6 +411,18 @@ def validate_filter_dsl(filter_dsl: dict, schema: List[dict]) -> bool:
                 "column": "attendance",
                 "operator": "<",
                 "value": 75
+            },
+            {
+                "column": "signup_date",
+                "operator": "between",
+                "value": ["2024-01-01", "2024-03-31"]
+            },
+            {
+                "logic": "OR",
+                "conditions": [
+                    {"column": "city", "operator": "==", "value": "Pune"},
+                    {"not": {"column": "last_purchase", "operator": "within_last_days", "value": 30}}
+                ]
             }
         ]
     }
@@ -88,164 +434,600 @@ def validate_filter_dsl(filter_dsl: dict, schema: List[dict]) -> bool:
     if not isinstance(filter_dsl, dict):
         raise FilterValidationError("Filter must be a JSON object.")
 
-    logic = filter_dsl.get("logic")
-    conditions = filter_dsl.get("conditions")
-
-    if logic not in ["AND", "OR"]:
+    if "not" not in filter_dsl and not is_group(filter_dsl):
         raise FilterValidationError("Filter logic must be 'AND' or 'OR'.")
 
-    if not isinstance(conditions, list) or len(conditions) == 0:
-        raise FilterValidationError("Filter must contain at least one condition.")
-
     schema_map = normalize_schema(schema)
 
-    allowed_operators = ["==", "<", ">", "<=", ">=", "contains"]
+    total = validate_filter_node(filter_dsl, schema_map, depth=1)
 
-    for condition in conditions:
+    if total > MAX_FILTER_CONDITIONS:
+        raise FilterValidationError(
+            f"Filter has {total} conditions (max {MAX_FILTER_CONDITIONS})."
+        )
 
-        if not isinstance(condition, dict):
-            raise FilterValidationError("Each condition must be an object.")
+    return True
 
-        raw_column = condition.get("column")
-        operator = condition.get("operator")
-        value = condition.get("value")
 
-        column = normalize_column_name(raw_column)
+# =====================================================
+# FILTER PLAN (COMPILED ONCE, EVALUATED PER FRAME / CHUNK)
+# =====================================================
 
-        if not column:
-            raise FilterValidationError("Condition missing 'column'.")
+# Fallback selectivity when the schema has no usable stats
+DEFAULT_SELECTIVITY = 0.33
+CONTAINS_SELECTIVITY = 0.25
 
-        if column not in schema_map:
-            raise FilterValidationError(f"Invalid column '{raw_column}'.")
+PATTERN_SELECTIVITY = 0.25
 
-        if operator not in allowed_operators:
-            raise FilterValidationError(
-                f"Invalid operator '{operator}'. Allowed operators: {allowed_operators}"
-            )
+# Relative evaluation cost per row (typed comparisons = 1)
+TEXT_COMPARE_COST = 2
+CONTAINS_COST = 4
+REGEX_COST = 6
 
-        if value is None:
-            raise FilterValidationError(
-                f"Condition for column '{raw_column}' must include a value."
-            )
+# Operators a bitmap index answers without reading the column
+INDEX_OPERATORS = ["==", "in", "not_in"]
 
-        column_type = schema_map[column]
 
-        # Type validation
-        if column_type == "number":
-            try:
-                float(value)
-            except (ValueError, TypeError):
-                raise FilterValidationError(
-                    f"Column '{raw_column}' expects a numeric value."
-                )
+def convert_column(series: pd.Series, column_type: str) -> pd.Series:
+    """
+    Column → comparable form for its schema type (done once per
+    column per evaluation, however many conditions reference it).
+    """
 
-        if column_type == "string":
-            if operator in ["<", ">", "<=", ">="]:
-                raise FilterValidationError(
-                    f"Operator '{operator}' not allowed for string column '{raw_column}'."
-                )
+    if column_type == "number":
+        if pd.api.types.is_numeric_dtype(series):
+            return series
+        # Text-stored numbers (e.g. "+9198...")
+        return pd.to_numeric(series.replace("", pd.NA), errors="coerce")
 
-    return True
+    if column_type == "date":
+        return to_dates(series)
 
+    if column_type == "boolean":
+        return to_booleans(series)
 
-# =====================================================
-# APPLY FILTER (ROBUST + SAFE)
-# =====================================================
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categories compare against the dictionary, not per row.
+        # Sidecars written before blanks were stored as null carry a
+        # "" category — treat it as missing, like the CSV path does
+        if "" in series.cat.categories:
+            return series.cat.remove_categories([""])
+        return series
 
-def apply_filter(
-    df: pd.DataFrame,
-    filter_definition: Dict,
-    schema: List[dict]
-) -> pd.DataFrame:
+    if not pd.api.types.is_string_dtype(series):
+        # Typed sidecar storage (text operator on a date / boolean
+        # column) → the text it was uploaded as
+        series = series.map(format_value)
 
-    if not filter_definition:
-        return df
+    # Arrow-backed strings: str ops / isin run as Arrow kernels and
+    # missing cells stay NA (never match)
+    return series.astype("string[pyarrow]").replace("", pd.NA)
 
-    if schema is None:
-        raise FilterValidationError("Schema is required for filtering.")
 
-    validate_filter_dsl(filter_definition, schema)
+def to_mask(result) -> np.ndarray:
+    # Missing values (NA / NaT) never match
+    if isinstance(result, pd.Series):
+        return result.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(result, dtype=bool)
 
-    logic = filter_definition.get("logic")
-    conditions = filter_definition.get("conditions")
 
-    # Normalize dataframe columns (must match validator logic)
-    df.columns = (
-        df.columns
-        .str.replace("\ufeff", "", regex=False)
-        .str.strip()
-        .str.lower()
-    )
+def range_fraction(low, high, minimum, maximum) -> float:
+    """
+    Share of [minimum, maximum] covered by [low, high] (None = open).
+    """
+
+    if minimum is None or maximum is None or maximum <= minimum:
+        return DEFAULT_SELECTIVITY
 
-    query_parts = []
+    low = minimum if low is None else max(low, minimum)
+    high = maximum if high is None else min(high, maximum)
 
-    for cond in conditions:
+    return max(0.0, min(1.0, (high - low) / (maximum - minimum)))
 
-        column = normalize_column_name(cond.get("column"))
-        operator = cond.get("operator")
-        value = cond.get("value")
 
-        if column not in df.columns:
-            raise FilterValidationError(f"Invalid column '{column}'")
+def histogram_fraction(edges: List[float], counts: List[int], low, high) -> Optional[float]:
+    """
+    Share of histogram rows inside [low, high] (None = open),
+    assuming values spread evenly within each bin.
+    """
 
-        series = df[column]
+    edges = np.asarray(edges, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    total = counts.sum()
 
-        if len(series) == 0:
-            continue
+    if not total:
+        return None
 
-        # Clean empty strings
-        series = series.replace("", pd.NA)
+    low = edges[0] if low is None else low
+    high = edges[-1] if high is None else high
 
-        # Detect numeric
-        numeric_series = pd.to_numeric(series, errors="coerce")
-        numeric_ratio = numeric_series.notna().sum() / len(series)
+    if high < low:
+        return 0.0
 
-        if numeric_ratio > 0.9:
-            series = numeric_series
-            try:
-                value = float(value)
-            except Exception:
-                raise FilterValidationError(
-                    f"Invalid numeric value for column '{column}'"
-                )
+    left, right = edges[:-1], edges[1:]
+    overlap = np.clip(np.minimum(right, high) - np.maximum(left, low), 0, None)
+
+    return float(min(1.0, (counts * overlap / (right - left)).sum() / total))
+
+
+def value_shares(stats: Dict) -> Optional[Dict[str, float]]:
+    """
+    Value → share of all rows, from exact per-value counts
+    (category columns).
+    """
+
+    counts = stats.get("value_counts")
+
+    if not counts:
+        return None
+
+    total = sum(counts.values()) + (stats.get("null_count") or 0)
+
+    return {value: count / total for value, count in counts.items()}
+
+
+class FilterContext:
+    """
+    One frame being filtered: referenced columns are converted
+    lazily, once, however many predicates use them. `index` is the
+    frame's bitmap index, if it has one.
+    """
+
+    def __init__(self, df: pd.DataFrame, lookup: Dict[str, str], index=None):
+        self.df = df
+        self.lookup = lookup
+        self.index = index
+        self.row_count = len(df)
+        self.converted: Dict[tuple, pd.Series] = {}
+
+    def values(self, column: str, column_type: str, positions: np.ndarray) -> pd.Series:
+        key = (column, column_type)
+
+        if key not in self.converted:
+            self.converted[key] = convert_column(
+                self.df[self.lookup[column]],
+                column_type
+            )
+
+        series = self.converted[key]
+
+        if len(positions) == self.row_count:
+            return series
+
+        return series.iloc[positions]
+
+
+class FilterPredicate:
+    """
+    One condition with its operand parsed for the column type.
+    """
+
+    def __init__(self, column: str, column_type: str, operator: str, value):
+        self.column = column
+        self.column_type = column_type
+        self.value_type = match_type(operator, column_type)
+        self.operator = operator
+
+        if column_type == "date" and operator in DATE_OPERATORS + RELATIVE_DATE_OPERATORS:
+            # "Today" is fixed at compile time — stable across chunks
+            self.bounds = date_range(operator, value)
+        elif operator == "between":
+            self.bounds = tuple(parse_operand(column_type, v) for v in value)
         else:
-            series = series.astype(str)
-            value = str(value)
+            self.bounds = None
+
+            if operator in SET_OPERATORS:
+                self.operand = list({parse_operand(column_type, v) for v in value})
+            elif operator == "regex":
+                self.pattern = value
+                self.operand = re.compile(value)
+            else:
+                self.operand = parse_operand(self.value_type, value)
+
+        self.estimate = DEFAULT_SELECTIVITY
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    @property
+    def cost(self) -> float:
+        if self.operator == "regex":
+            return REGEX_COST
+        if self.operator in ["contains", "startswith", "endswith"]:
+            return CONTAINS_COST
+        if self.operator in SET_OPERATORS:
+            return 1
+        if self.column_type == "string":
+            return TEXT_COMPARE_COST
+        return 1
+
+    def select(self, context: FilterContext, positions: np.ndarray) -> np.ndarray:
+        mask = self.index_mask(context.index)
+
+        if mask is not None:
+            return positions[mask[positions]]
+
+        series = context.values(self.column, self.value_type, positions)
+        return positions[self.evaluate(series)]
+
+    def index_mask(self, index) -> Optional[np.ndarray]:
+        """
+        Full-length row mask from the bitmap index, or None when
+        the column is not indexed / the operator needs the data.
+        """
+
+        if (
+            index is None
+            or self.operator not in INDEX_OPERATORS
+            or not index.covers(self.column)
+        ):
+            return None
+
+        if self.operator == "==":
+            return index.mask(self.column, [self.operand])
+
+        mask = index.mask(self.column, self.operand)
+
+        if self.operator == "not_in":
+            # Missing cells never match
+            return index.present(self.column) & ~mask
+
+        return mask
+
+    def evaluate(self, series: pd.Series) -> np.ndarray:
+        operator = self.operator
+
+        if self.bounds is not None:
+            low, high = self.bounds
+            mask = np.ones(len(series), dtype=bool)
+
+            if low is not None:
+                np.logical_and(mask, to_mask(series >= low), out=mask)
+
+            if high is not None:
+                # Date ranges are half-open, 'between' is inclusive
+                upper = series < high if self.column_type == "date" else series <= high
+                np.logical_and(mask, to_mask(upper), out=mask)
+
+            return mask
+
+        value = self.operand
 
-        # Apply operator
         if operator == "==":
-            mask = series == value
+            return to_mask(series == value)
+        if operator == "<":
+            return to_mask(series < value)
+        if operator == ">":
+            return to_mask(series > value)
+        if operator == "<=":
+            return to_mask(series <= value)
+        if operator == ">=":
+            return to_mask(series >= value)
+        if operator == "contains":
+            return to_mask(series.str.contains(value, na=False))
+        if operator == "in":
+            return to_mask(series.isin(value))
+        if operator == "not_in":
+            return to_mask(series.notna() & ~series.isin(value))
+        if operator == "startswith":
+            return to_mask(series.str.startswith(value))
+        if operator == "endswith":
+            return to_mask(series.str.endswith(value))
+        if operator == "regex":
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Matched once per category, not per row
+                return to_mask(series.str.match(value))
+            return to_mask(series.str.match(self.pattern))
+
+        raise FilterValidationError(f"Unsupported operator '{operator}'")
+
+    def selectivity(self, stats: Dict) -> float:
+        """
+        Estimated share of rows matching, from schema stats.
+        """
+
+        stats = stats or {}
+        distinct = stats.get("distinct_count")
+        shares = value_shares(stats) if self.column_type == "category" else None
+
+        if shares is not None and self.operator in ["=="] + SET_OPERATORS:
+            values = [self.operand] if self.operator == "==" else self.operand
+            share = sum(shares.get(value, 0.0) for value in values)
+            return share if self.operator != "not_in" else sum(shares.values()) - share
+
+        if self.operator == "==":
+            return 1 / distinct if distinct else DEFAULT_SELECTIVITY
+
+        if self.operator in SET_OPERATORS:
+            share = min(1.0, len(self.operand) / distinct) if distinct else DEFAULT_SELECTIVITY
+            return share if self.operator == "in" else 1 - share
+
+        if self.operator == "contains":
+            return CONTAINS_SELECTIVITY
+
+        if self.operator in PATTERN_OPERATORS:
+            return PATTERN_SELECTIVITY
+
+        minimum, maximum = stats.get("min"), stats.get("max")
+
+        if minimum is None or maximum is None:
+            return DEFAULT_SELECTIVITY
+
+        buckets = stats.get("histogram") or {}
+
+        try:
+            if self.column_type == "date":
+                stat_key = lambda value: parse_date_value(value).value
+                as_key = lambda bound: None if bound is None else bound.value
+            else:
+                stat_key = float
+                as_key = lambda bound: bound
+
+            minimum, maximum = stat_key(minimum), stat_key(maximum)
+            edges = [stat_key(edge) for edge in buckets.get("edges") or []]
+        except (ValueError, TypeError):
+            return DEFAULT_SELECTIVITY
+
+        if self.bounds is not None:
+            low, high = (as_key(bound) for bound in self.bounds)
+        elif self.operator in ("<", "<="):
+            low, high = None, as_key(self.operand)
+        else:
+            low, high = as_key(self.operand), None
 
-        elif operator == "<":
-            mask = series < value
+        if edges:
+            fraction = histogram_fraction(edges, buckets.get("counts"), low, high)
 
-        elif operator == ">":
-            mask = series > value
+            if fraction is not None:
+                # Histogram covers present cells only
+                present = sum(buckets["counts"])
+                return fraction * present / (present + (stats.get("null_count") or 0))
 
-        elif operator == "<=":
-            mask = series <= value
+        return range_fraction(low, high, minimum, maximum)
 
-        elif operator == ">=":
-            mask = series >= value
 
-        elif operator == "contains":
-            if not pd.api.types.is_string_dtype(series):
-                raise FilterValidationError(
-                    f"'contains' only valid for string column '{column}'"
-                )
-            mask = series.str.contains(value, na=False)
+class FilterNot:
 
+    def __init__(self, child):
+        self.child = child
+        self.estimate = 1 - child.estimate
+
+    @property
+    def columns(self) -> List[str]:
+        return self.child.columns
+
+    @property
+    def cost(self) -> float:
+        return self.child.cost
+
+    def select(self, context: FilterContext, positions: np.ndarray) -> np.ndarray:
+        matched = self.child.select(context, positions)
+        return positions[~np.isin(positions, matched, assume_unique=True)]
+
+    def index_mask(self, index) -> Optional[np.ndarray]:
+        mask = self.child.index_mask(index)
+        return None if mask is None else ~mask
+
+
+class FilterGroup:
+    """
+    AND / OR over child nodes with row-level short-circuiting:
+    AND evaluates each child only on rows that survived the
+    previous ones; OR only on rows not matched yet.
+    """
+
+    def __init__(self, logic: str, children: list):
+        self.logic = logic
+        self.children = children
+
+        estimates = [child.estimate for child in children]
+
+        if logic == "AND":
+            self.estimate = float(np.prod(estimates))
+            # Cheap, selective first (classic cost / (1 - s) rank)
+            rank = lambda c: c.cost / max(1 - c.estimate, 1e-6)
         else:
-            raise FilterValidationError(f"Unsupported operator '{operator}'")
+            self.estimate = 1 - float(np.prod([1 - e for e in estimates]))
+            # Cheap, broad first — matched rows drop out early
+            rank = lambda c: c.cost / max(c.estimate, 1e-6)
 
-        query_parts.append(mask)
+        # Stable sort keeps DSL order among equal ranks
+        self.children.sort(key=rank)
 
-    if not query_parts:
-        return df
+    @property
+    def columns(self) -> List[str]:
+        return list(dict.fromkeys(
+            column for child in self.children for column in child.columns
+        ))
 
-    if logic == "AND":
-        final_mask = reduce(lambda x, y: x & y, query_parts)
-    else:
-        final_mask = reduce(lambda x, y: x | y, query_parts)
+    @property
+    def cost(self) -> float:
+        return sum(child.cost for child in self.children)
+
+    def select(self, context: FilterContext, positions: np.ndarray) -> np.ndarray:
+
+        if self.logic == "AND":
+            for child in self.children:
+                if not len(positions):
+                    break
+                positions = child.select(context, positions)
+            return positions
+
+        matched = []
+        remaining = positions
+
+        for child in self.children:
+            if not len(remaining):
+                break
+
+            hits = child.select(context, remaining)
+
+            if len(hits):
+                matched.append(hits)
+                remaining = remaining[~np.isin(remaining, hits, assume_unique=True)]
+
+        if not matched:
+            return positions[:0]
+
+        return np.sort(np.concatenate(matched))
+
+    def index_mask(self, index) -> Optional[np.ndarray]:
+        """
+        Pure bitmap AND / OR when every child is index-answerable.
+        """
+
+        masks = []
+
+        for child in self.children:
+            mask = child.index_mask(index)
+
+            if mask is None:
+                return None
+
+            masks.append(mask)
+
+        combine = np.logical_and if self.logic == "AND" else np.logical_or
+        return combine.reduce(masks)
+
+
+class FilterPlan:
+    """
+    Filter DSL compiled against a schema: validated once, column
+    types resolved once, operands parsed once and every group's
+    children ordered by estimated cost and selectivity.
+
+    evaluate() works on any frame or chunk with the dataset's
+    columns, converting each referenced column at most once. With
+    the dataset's bitmap index, indexed ==/in/not_in conditions are
+    answered from bitmaps; fully indexed plans never read a column.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.columns = root.columns
+
+    def evaluate_index(self, index) -> Optional[np.ndarray]:
+        """
+        Row mask from bitmaps alone, or None if some condition
+        needs column data.
+        """
+
+        if index is None:
+            return None
+
+        return self.root.index_mask(index)
+
+    def evaluate(self, df: pd.DataFrame, index=None) -> np.ndarray:
+
+        # Bitmaps cover the whole dataset — never a chunk or subset
+        if index is not None and index.row_count != len(df):
+            index = None
+
+        mask = self.evaluate_index(index)
+
+        if mask is not None:
+            return mask
+
+        context = FilterContext(df, resolve_columns(df, self.columns), index)
+
+        positions = self.root.select(context, np.arange(len(df)))
+
+        mask = np.zeros(len(df), dtype=bool)
+        mask[positions] = True
+
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[self.evaluate(df)]
+
+
+def resolve_columns(df: pd.DataFrame, columns: List[str]) -> Dict[str, str]:
+    """
+    Normalized column name → actual frame column (frames from
+    csv_engine / dataset_store are already normalized).
+    """
+
+    lookup = {column: column for column in columns if column in df.columns}
+
+    if len(lookup) < len(columns):
+        normalized = {normalize_column_name(c): c for c in df.columns}
+
+        for column in columns:
+            if column not in lookup:
+                if column not in normalized:
+                    raise FilterValidationError(f"Invalid column '{column}'")
+                lookup[column] = normalized[column]
+
+    return lookup
+
+
+def compile_filter(
+    filter_definition: Dict,
+    schema: List[dict]
+) -> Optional[FilterPlan]:
+    """
+    Validate + compile a filter DSL (None when there is no filter).
+    """
+
+    if not filter_definition:
+        return None
+
+    if schema is None:
+        raise FilterValidationError("Schema is required for filtering.")
+
+    validate_filter_dsl(filter_definition, schema)
+
+    schema_map = normalize_schema(schema)
+    stats = {
+        normalize_column_name(col.get("name")): col.get("stats") or {}
+        for col in schema
+    }
+
+    return FilterPlan(compile_node(filter_definition, schema_map, stats))
+
+
+def compile_node(node: dict, schema_map: Dict[str, str], stats: Dict[str, Dict]):
+
+    if "not" in node:
+        return FilterNot(compile_node(node["not"], schema_map, stats))
+
+    if is_group(node):
+        return FilterGroup(
+            node.get("logic"),
+            [compile_node(child, schema_map, stats) for child in node.get("conditions")]
+        )
+
+    column = normalize_column_name(node.get("column"))
+
+    predicate = FilterPredicate(
+        column,
+        schema_map[column],
+        node.get("operator"),
+        node.get("value")
+    )
+    predicate.estimate = predicate.selectivity(stats.get(column))
+
+    return predicate
+
+
+# =====================================================
+# APPLY FILTER (ROBUST + SAFE)
+# =====================================================
+
+def apply_filter(
+    df: pd.DataFrame,
+    filter_definition: Dict,
+    schema: List[dict]
+) -> pd.DataFrame:
+    """
+    One-shot filter. Callers filtering several chunks with the
+    same DSL should compile_filter() once and reuse the plan.
+    """
+
+    plan = compile_filter(filter_definition, schema)
+
+    if plan is None or df.empty:
+        return df
 
-    return df[final_mask]
\ No newline at end of file
+    return plan.apply(df)
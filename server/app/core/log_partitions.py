@@ -0,0 +1,541 @@
+# app/core/log_partitions.py
+
+import os
+import re
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+# Future monthly partitions kept ready for inserts
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "2"))
+
+# Months kept in Postgres; older partitions are archived + dropped
+LOG_HOT_MONTHS = int(os.getenv("LOG_HOT_MONTHS", "3"))
+
+# Retention for orgs without their own log_retention_days
+DEFAULT_LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "365"))
+
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "log_archive")
+LOG_ARCHIVE_CHUNK_SIZE = 50_000
+
+LOG_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("LOG_MAINTENANCE_INTERVAL_SECONDS", str(6 * 3600)))
+
+PARENT_TABLE = "execution_logs"
+
+# Catches inserts for months without a partition yet (late
+# maintenance, clock skew at month end); emptied by maintenance
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# Only one process (of several workers) runs maintenance at a time
+MAINTENANCE_LOCK_KEY = 8041207
+
+# Serializes partition creation (held until the transaction ends)
+PARTITION_LOCK_KEY = 8041208
+
+UPPER_BOUND_METADATA_KEY = b"upper_bound"
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("organization_id", pa.int64()),
+    ("campaign_execution_id", pa.int64()),
+    ("channel_type", pa.string()),
+    ("recipient_value", pa.string()),
+    ("rendered_message", pa.string()),
+    ("delivery_status", pa.string()),
+    ("is_failed", pa.bool_()),
+    ("provider_message_id", pa.string()),
+    ("provider_response_code", pa.string()),
+    ("provider_response_message", pa.string()),
+    ("retry_count", pa.int64()),
+    ("is_retried", pa.bool_()),
+    ("sent_at", pa.timestamp("us")),
+    ("created_at", pa.timestamp("us")),
+])
+
+
+# =====================================================
+# MONTHS
+# =====================================================
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+# =====================================================
+# PARTITIONS
+# =====================================================
+
+BOUND_PATTERN = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def parse_bound(value: str) -> Optional[datetime]:
+    value = value.strip()
+
+    if value.upper() == "MINVALUE":
+        return None
+
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def list_log_partitions(conn: Connection) -> List[Tuple[str, Optional[datetime], datetime]]:
+    """
+    (name, lower bound, upper bound) of every partition, oldest
+    first. Lower is None for the MINVALUE partition (pre-partition
+    history). The default partition has no bounds and is not listed.
+    """
+
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT_TABLE}).all()
+
+    partitions = []
+
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or "")
+
+        if not match:
+            continue
+
+        partitions.append((name, parse_bound(match.group(1)), parse_bound(match.group(2))))
+
+    return sorted(partitions, key=lambda p: p[2])
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = CAST(:parent AS regclass))"
+    ), {"parent": PARENT_TABLE}).scalar()
+
+
+def default_partition_months(conn: Connection) -> List[datetime]:
+    return [
+        month for (month,) in conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', created_at) FROM {DEFAULT_PARTITION}"
+        )).all()
+    ]
+
+
+def create_log_partition(conn: Connection, lower: datetime):
+    """
+    Add the partition for the month starting at lower. Rows that
+    already landed in the default partition for that month are
+    moved into it first — ATTACH refuses while they are there.
+    """
+
+    name = partition_name(lower)
+    upper = add_months(lower, 1)
+
+    conn.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"
+    ))
+
+    conn.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE created_at >= :lower AND created_at < :upper RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), {"lower": lower, "upper": upper})
+
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    ))
+
+
+def ensure_log_partitions(conn: Connection, months_ahead: int = LOG_PARTITION_MONTHS_AHEAD):
+    """
+    Create the default partition, this month's partition and the
+    next months_ahead ones, plus a partition for every month that
+    has rows waiting in the default partition. Months already
+    covered (e.g. by the pre-partition history partition) are
+    skipped.
+    """
+
+    if not is_partitioned(conn):
+        logger.warning(
+            "%s is not partitioned yet; run python -m app.models.log_migrations",
+            PARENT_TABLE
+        )
+        return
+
+    # Workers starting together would race on the same CREATEs
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"),
+        {"key": PARTITION_LOCK_KEY}
+    )
+
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+        f"PARTITION OF {PARENT_TABLE} DEFAULT"
+    ))
+
+    covered = list_log_partitions(conn)
+    first = month_start(datetime.utcnow())
+
+    months = {add_months(first, offset) for offset in range(months_ahead + 1)}
+    months.update(default_partition_months(conn))
+
+    for lower in sorted(months):
+        upper = add_months(lower, 1)
+
+        if any(
+            (start is None or start < upper) and lower < end
+            for _, start, end in covered
+        ):
+            continue
+
+        create_log_partition(conn, lower)
+
+
+# =====================================================
+# ARCHIVE
+# =====================================================
+
+def org_retention_days(conn: Connection) -> Dict[int, int]:
+    rows = conn.execute(text(
+        "SELECT id, log_retention_days FROM organizations"
+    )).all()
+
+    return {
+        org_id: days if days is not None else DEFAULT_LOG_RETENTION_DAYS
+        for org_id, days in rows
+    }
+
+
+def archive_path(org_id: int, partition: str) -> str:
+    return os.path.join(LOG_ARCHIVE_DIR, f"org_{org_id}", f"{partition}.parquet")
+
+
+def archive_partition(engine: Engine, partition: str, upper: datetime) -> Dict[int, int]:
+    """
+    Write a partition's rows to one zstd Parquet file per org, then
+    drop the partition. Orgs whose retention already ended before
+    the partition's last day are not archived. Returns rows
+    archived per org.
+    """
+
+    now = datetime.utcnow()
+    writers: Dict[int, pq.ParquetWriter] = {}
+    archived: Dict[int, int] = {}
+
+    with engine.connect() as conn:
+        retention = org_retention_days(conn)
+
+        # Server-side cursor — the partition is never held in memory
+        result = conn.execution_options(yield_per=LOG_ARCHIVE_CHUNK_SIZE).execute(text(
+            f"SELECT l.id, e.organization_id, l.campaign_execution_id, l.channel_type, "
+            f"l.recipient_value, l.rendered_message, l.delivery_status, l.is_failed, "
+            f"l.provider_message_id, l.provider_response_code, "
+            f"l.provider_response_message, l.retry_count, l.is_retried, "
+            f"l.sent_at, l.created_at "
+            f"FROM {partition} l "
+            f"JOIN campaign_executions e ON e.id = l.campaign_execution_id "
+            # Clustered by execution so row-group stats prune reads
+            f"ORDER BY l.campaign_execution_id, l.created_at, l.id"
+        ))
+
+        try:
+            for rows in result.partitions():
+                by_org: Dict[int, list] = {}
+
+                for row in rows:
+                    org_id = row.organization_id
+                    days = retention.get(org_id, DEFAULT_LOG_RETENTION_DAYS)
+
+                    if upper <= now - timedelta(days=days):
+                        continue
+
+                    by_org.setdefault(org_id, []).append(row._asdict())
+
+                for org_id, records in by_org.items():
+                    if org_id not in writers:
+                        path = archive_path(org_id, partition)
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                        writers[org_id] = pq.ParquetWriter(
+                            path + ".tmp",
+                            ARCHIVE_SCHEMA.with_metadata({
+                                UPPER_BOUND_METADATA_KEY: upper.isoformat()
+                            }),
+                            compression="zstd"
+                        )
+
+                    writers[org_id].write_table(
+                        pa.Table.from_pylist(records, schema=ARCHIVE_SCHEMA)
+                    )
+                    archived[org_id] = archived.get(org_id, 0) + len(records)
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    for org_id in writers:
+        path = archive_path(org_id, partition)
+        os.replace(path + ".tmp", path)
+
+    # Files are complete on disk — only now is the data dropped
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+
+    return archived
+
+
+def archive_upper_bound(path: str) -> Optional[datetime]:
+    metadata = pq.read_schema(path).metadata or {}
+    raw = metadata.get(UPPER_BOUND_METADATA_KEY)
+    return datetime.fromisoformat(raw.decode("utf-8")) if raw else None
+
+
+def purge_expired_archives(retention: Dict[int, int]):
+    """
+    Delete archive files whose newest possible row is past the
+    org's retention.
+    """
+
+    if not os.path.isdir(LOG_ARCHIVE_DIR):
+        return
+
+    now = datetime.utcnow()
+
+    for entry in os.listdir(LOG_ARCHIVE_DIR):
+        if not entry.startswith("org_"):
+            continue
+
+        try:
+            org_id = int(entry[len("org_"):])
+        except ValueError:
+            continue
+
+        cutoff = now - timedelta(days=retention.get(org_id, DEFAULT_LOG_RETENTION_DAYS))
+        directory = os.path.join(LOG_ARCHIVE_DIR, entry)
+
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+
+            if not name.endswith(".parquet"):
+                continue
+
+            upper = archive_upper_bound(path)
+
+            if upper is not None and upper <= cutoff:
+                os.remove(path)
+
+
+def archive_files(org_id: int, since: datetime) -> List[str]:
+    """
+    The org's archive files that can hold rows newer than `since`,
+    oldest first.
+    """
+
+    directory = os.path.join(LOG_ARCHIVE_DIR, f"org_{org_id}")
+
+    if not os.path.isdir(directory):
+        return []
+
+    files = []
+
+    for name in os.listdir(directory):
+        if name.endswith(".parquet"):
+            path = os.path.join(directory, name)
+            upper = archive_upper_bound(path)
+
+            if upper is None or upper > since:
+                files.append((upper or datetime.max, path))
+
+    return [path for _, path in sorted(files)]
+
+
+def archive_filters(
+    execution_id: int,
+    status: Optional[str] = None,
+    recipient: Optional[str] = None
+) -> List[tuple]:
+    filters = [("campaign_execution_id", "=", execution_id)]
+
+    if status:
+        filters.append(("delivery_status", "=", status))
+
+    if recipient:
+        filters.append(("recipient_value", "=", recipient))
+
+    return filters
+
+
+def keyset_filters(filters: List[tuple], before: Optional[Tuple[datetime, int]]) -> list:
+    """
+    `filters` plus the (created_at, id) < before bound, in the
+    disjunctive form Parquet row-group pruning understands.
+    """
+
+    if before is None:
+        return filters
+
+    created_at, log_id = before
+
+    return [
+        filters + [("created_at", "<", created_at)],
+        filters + [("created_at", "=", created_at), ("id", "<", log_id)],
+    ]
+
+
+def table_rows(table: pa.Table) -> List[tuple]:
+    return list(zip(*(column.to_pylist() for column in table.columns)))
+
+
+def read_archived_logs(
+    org_id: int,
+    execution_id: int,
+    since: datetime,
+    columns: List[str],
+    status: Optional[str] = None
+) -> Iterator[List[tuple]]:
+    """
+    Archived rows of one execution (oldest first), in chunks of
+    tuples ordered like `columns`. Only files that can hold rows
+    newer than `since` are opened.
+    """
+
+    order = [("created_at", "ascending"), ("id", "ascending")]
+    read_columns = list(dict.fromkeys(columns + [name for name, _ in order]))
+
+    for path in archive_files(org_id, since):
+        table = pq.read_table(
+            path,
+            columns=read_columns,
+            filters=archive_filters(execution_id, status)
+        ).sort_by(order).select(columns)
+
+        for batch in table.to_batches(LOG_ARCHIVE_CHUNK_SIZE):
+            yield table_rows(batch)
+
+
+def read_archived_log_page(
+    org_id: int,
+    execution_id: int,
+    since: datetime,
+    columns: List[str],
+    limit: int,
+    offset: int = 0,
+    before: Optional[Tuple[datetime, int]] = None,
+    status: Optional[str] = None,
+    recipient: Optional[str] = None
+) -> List[tuple]:
+    """
+    Newest-first page of one execution's archived rows, as tuples
+    ordered like `columns`. `before` is a (created_at, id) keyset
+    bound, pushed into the Parquet read so row groups past it are
+    skipped. Files are month partitions, so they are read newest
+    first and reading stops once the page is filled.
+    """
+
+    order = [("created_at", "descending"), ("id", "descending")]
+    read_columns = list(dict.fromkeys(columns + [name for name, _ in order]))
+    filters = keyset_filters(archive_filters(execution_id, status, recipient), before)
+
+    tables = []
+    found = 0
+
+    for path in reversed(archive_files(org_id, since)):
+        table = pq.read_table(path, columns=read_columns, filters=filters)
+
+        if table.num_rows:
+            tables.append(table)
+            found += table.num_rows
+
+        if found >= offset + limit:
+            break
+
+    if not tables:
+        return []
+
+    table = pa.concat_tables(tables)
+
+    return table_rows(table.sort_by(order).slice(offset, limit).select(columns))
+
+
+# =====================================================
+# MAINTENANCE
+# =====================================================
+
+def run_log_maintenance(engine: Engine):
+    """
+    Keep future partitions ready, archive + drop partitions older
+    than LOG_HOT_MONTHS, purge archives past each org's retention.
+    """
+
+    with engine.connect() as lock:
+        if not lock.execute(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": MAINTENANCE_LOCK_KEY}
+        ).scalar():
+            return
+
+        try:
+            with engine.begin() as conn:
+                if not is_partitioned(conn):
+                    return
+
+                ensure_log_partitions(conn)
+                partitions = list_log_partitions(conn)
+                retention = org_retention_days(conn)
+
+            horizon = add_months(month_start(datetime.utcnow()), -LOG_HOT_MONTHS)
+
+            for name, _, upper in partitions:
+                if upper <= horizon:
+                    archived = archive_partition(engine, name, upper)
+                    logger.info("Archived log partition %s: %s", name, archived)
+
+            purge_expired_archives(retention)
+
+        finally:
+            lock.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": MAINTENANCE_LOCK_KEY}
+            )
+            lock.commit()
+
+
+def start_log_maintenance(engine: Engine):
+    """
+    Daemon thread running run_log_maintenance every
+    LOG_MAINTENANCE_INTERVAL_SECONDS.
+    """
+
+    def loop():
+        while True:
+            try:
+                run_log_maintenance(engine)
+            except Exception as e:
+                logger.warning("Log maintenance failed: %s", e)
+
+            time.sleep(LOG_MAINTENANCE_INTERVAL_SECONDS)
+
+    threading.Thread(target=loop, daemon=True).start()
@@ -0,0 +1,30 @@
+# app/core/pagination.py
+
+import json
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+# =====================================================
+# KEYSET CURSORS
+# =====================================================
+# Opaque token for "rows after (created_at, id)" in a
+# (created_at DESC, id DESC) listing. Unlike OFFSET, the next
+# page is an index seek — page N costs the same as page 1.
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursorError("Invalid cursor.")
@@ -1,18 +1,27 @@
 # app/core/progress_manager.py
 
-from typing import Dict, Set
+from typing import Dict, Set, Tuple, Optional, AsyncIterator
 from fastapi import WebSocket
 import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
 class ProgressManager:
     """
     Manages WebSocket connections per execution.
     Safe for 1–2K row executions.
     Organization isolation must be handled in websocket route.
+
+    Also keeps the latest progress event per execution so SSE
+    listeners can resume (Last-Event-ID) and receive coalesced
+    updates. Executions broadcast from their own worker thread /
+    event loop, so that state is guarded by a threading lock.
     """
 
     def __init__(self):
@@ -20,6 +29,14 @@ class ProgressManager:
         self.active_connections: Dict[int, Set[WebSocket]] = {}
         self.lock = asyncio.Lock()
 
+        # execution_id -> (event_id, message)
+        self.latest_events: Dict[int, Tuple[int, dict]] = {}
+
+        # execution_id -> set of (listener loop, wake-up event)
+        self.listeners: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+        self.state_lock = threading.Lock()
+
     # =====================================================
     # CONNECT
     # =====================================================
@@ -46,6 +63,98 @@ class ProgressManager:
                 if not self.active_connections[execution_id]:
                     del self.active_connections[execution_id]
 
+    # =====================================================
+    # EVENT STATE (SSE)
+    # =====================================================
+
+    def record(self, execution_id: int, message: dict) -> int:
+        """
+        Store message as the latest event and wake SSE listeners.
+        Returns the new event id.
+        """
+
+        with self.state_lock:
+            previous = self.latest_events.get(execution_id)
+            event_id = previous[0] + 1 if previous else 1
+
+            self.latest_events[execution_id] = (event_id, message)
+            listeners = list(self.listeners.get(execution_id, set()))
+
+            # Nobody is listening to a finished execution — drop its state
+            if not listeners and message.get("status") in TERMINAL_STATUSES:
+                del self.latest_events[execution_id]
+
+        for loop, wake_up in listeners:
+            try:
+                loop.call_soon_threadsafe(wake_up.set)
+            except RuntimeError:
+                # Listener loop already closed
+                pass
+
+        return event_id
+
+    def latest(self, execution_id: int) -> Optional[Tuple[int, dict]]:
+        with self.state_lock:
+            return self.latest_events.get(execution_id)
+
+    async def subscribe(
+        self,
+        execution_id: int,
+        last_event_id: int = 0,
+        keepalive_seconds: float = 15,
+        min_interval_seconds: float = 0.5
+    ) -> AsyncIterator[Optional[Tuple[int, dict]]]:
+        """
+        Yield (event_id, message) for every newer event, coalescing
+        bursts into the latest state. Yields None on keepalive ticks
+        so the caller can emit a comment and check for disconnects.
+        """
+
+        wake_up = asyncio.Event()
+        listener = (asyncio.get_running_loop(), wake_up)
+
+        with self.state_lock:
+            self.listeners.setdefault(execution_id, set()).add(listener)
+
+        # Deliver anything newer than what the client already saw
+        wake_up.set()
+
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(wake_up.wait(), keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                wake_up.clear()
+
+                current = self.latest(execution_id)
+
+                if current and current[0] > last_event_id:
+                    last_event_id = current[0]
+                    yield current
+
+                    if current[1].get("status") in TERMINAL_STATUSES:
+                        return
+
+                # Let further updates pile up into a single event
+                await asyncio.sleep(min_interval_seconds)
+
+        finally:
+            with self.state_lock:
+                bucket = self.listeners.get(execution_id)
+
+                if bucket is not None:
+                    bucket.discard(listener)
+
+                    if not bucket:
+                        del self.listeners[execution_id]
+
+                        current = self.latest_events.get(execution_id)
+                        if current and current[1].get("status") in TERMINAL_STATUSES:
+                            del self.latest_events[execution_id]
+
     # =====================================================
     # SAFE BROADCAST
     # =====================================================
@@ -56,6 +165,8 @@ class ProgressManager:
         Does NOT hold lock while sending (important for performance).
         """
 
+        self.record(execution_id, message)
+
         async with self.lock:
             connections = list(
                 self.active_connections.get(execution_id, set())
@@ -80,4 +191,4 @@ class ProgressManager:
 
 
 # Singleton instance
-progress_manager = ProgressManager()
\ No newline at end of file
+progress_manager = ProgressManager()
@@ -0,0 +1,176 @@
+# app/core/response_cache.py
+
+import os
+import json
+import time
+import threading
+import functools
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Versions are per process: a bump only reaches the worker that
+# made it. Entries expire within the org summary window, so other
+# workers serve stale numbers for at most this long.
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("ORG_SUMMARY_TTL_SECONDS", "15"))
+
+# Endpoint arguments that are not part of the cache key
+UNKEYED_ARGUMENTS = ("db", "current_user")
+
+
+# =====================================================
+# ORG DATA VERSIONS
+# =====================================================
+
+class AnalyticsVersions:
+    """
+    Per-org counter bumped whenever the org's analytics change
+    (log flush, execution start / completion, template or dataset
+    changes). Cached responses are keyed by it, so a bump makes
+    every older entry of the org unreachable at once — in this
+    process; other workers rely on RESPONSE_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self.versions: Dict[int, int] = {}
+        self.lock = threading.Lock()
+
+    def get(self, org_id: int) -> int:
+        with self.lock:
+            return self.versions.get(org_id, 0)
+
+    def bump(self, org_id: int):
+        if org_id is None:
+            return
+
+        with self.lock:
+            self.versions[org_id] = self.versions.get(org_id, 0) + 1
+
+
+# Singleton instance
+analytics_versions = AnalyticsVersions()
+
+
+def bump_analytics_version(org_id: int):
+    analytics_versions.bump(org_id)
+
+
+# =====================================================
+# RESPONSE CACHE
+# =====================================================
+
+class ResponseCache:
+    """
+    LRU of pre-serialized JSON bodies within a byte budget; each
+    entry expires ttl seconds after it was stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        ttl: float = RESPONSE_CACHE_TTL_SECONDS
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: "OrderedDict[Tuple, Tuple[float, bytes]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires, body = entry
+
+            if expires <= time.monotonic():
+                del self.entries[key]
+                self.total_bytes -= len(body)
+                return None
+
+            self.entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+
+            if previous is not None:
+                self.total_bytes -= len(previous[1])
+
+            self.entries[key] = (time.monotonic() + self.ttl, body)
+            self.total_bytes += len(body)
+
+            # Superseded versions are never read again; LRU drops them
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+            }
+
+
+# Singleton instance
+response_cache = ResponseCache()
+
+
+def cached_response(endpoint=None, *, daily: bool = False):
+    """
+    Cache an org-scoped analytics endpoint's JSON body, keyed by
+    (org, endpoint, query params, org analytics version), for at
+    most RESPONSE_CACHE_TTL_SECONDS. Repeat loads return the stored
+    bytes without running the endpoint.
+
+    daily=True adds today's UTC date to the key, for endpoints
+    whose window is relative to now ("last 7 days") — otherwise an
+    org with no new activity keeps an older day's window.
+    """
+
+    if endpoint is None:
+        return functools.partial(cached_response, daily=daily)
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        org_id = kwargs["current_user"].organization_id
+
+        params = tuple(sorted(
+            (name, value) for name, value in kwargs.items()
+            if name not in UNKEYED_ARGUMENTS
+        ))
+
+        key = (
+            org_id,
+            endpoint.__name__,
+            params,
+            analytics_versions.get(org_id),
+            datetime.utcnow().date() if daily else None,
+        )
+
+        body = response_cache.get(key)
+
+        if body is None:
+            body = json.dumps(jsonable_encoder(endpoint(*args, **kwargs))).encode("utf-8")
+            response_cache.put(key, body)
+
+        return Response(content=body, media_type="application/json")
+
+    return wrapper
@@ -0,0 +1,527 @@
+# app/core/schema_engine.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Callable, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+INFERENCE_SAMPLE_SIZE = 10_000
+SCHEMA_CACHE_SIZE = 512
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# Decimal / scientific notation (cells are trimmed first)
+NUMERIC_PATTERN = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+# ISO 8601 date / datetime, optional UTC offset
+DATE_PATTERN = (
+    r"^\d{4}-\d{1,2}-\d{1,2}"
+    r"([T ]\d{1,2}:\d{2}(:\d{2}(\.\d{1,9})?)?)?"
+    r"(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+BOOLEAN_VALUES = {
+    "true": True,
+    "yes": True,
+    "false": False,
+    "no": False,
+}
+
+# Low-cardinality text → category (dictionary-encoded storage)
+CATEGORY_MAX_DISTINCT = 256
+CATEGORY_MAX_RATIO = 0.5
+
+# Equi-width bins stored for number / date columns (estimates)
+HISTOGRAM_BINS = 20
+
+
+# =====================================================
+# COLUMN TYPES
+# =====================================================
+
+# Priority order: a column takes the first kind all its cells match
+DETECTED_KINDS = ("number", "boolean", "date")
+
+COLUMN_TYPES = DETECTED_KINDS + ("category", "string")
+
+ORDERED_TYPES = ("number", "date")
+TEXT_TYPES = ("string", "category")
+
+
+# =====================================================
+# ARROW HELPERS
+# =====================================================
+
+def as_arrow(values) -> pa.ChunkedArray:
+    """
+    pandas Series / Arrow array → ChunkedArray. Text columns become
+    Arrow strings so every check below runs as a C kernel.
+    """
+
+    if isinstance(values, pa.ChunkedArray):
+        return values
+
+    if isinstance(values, pa.Array):
+        return pa.chunked_array([values])
+
+    if (
+        pd.api.types.is_numeric_dtype(values.dtype)
+        or pd.api.types.is_bool_dtype(values.dtype)
+        or pd.api.types.is_datetime64_any_dtype(values.dtype)
+    ):
+        return pa.chunked_array([pa.array(values, from_pandas=True)])
+
+    try:
+        return pa.chunked_array([
+            pa.array(values.astype(object), type=pa.string(), from_pandas=True)
+        ])
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Object column of typed values (e.g. datetime.date)
+        return pa.chunked_array([pa.array(values.astype(object), from_pandas=True)])
+
+
+def trimmed_cells(values) -> pa.ChunkedArray:
+    """
+    Whitespace-trimmed text of every cell ("" for missing), as one
+    Arrow kernel rather than a Python str.strip() per cell.
+    """
+
+    values = as_arrow(values)
+
+    if not pa.types.is_string(values.type):
+        values = values.cast(pa.string())
+
+    return pc.fill_null(pc.utf8_trim_whitespace(values), "")
+
+
+def trimmed_text(series: pd.Series) -> pd.Series:
+    return pd.Series(
+        trimmed_cells(series).to_numpy(zero_copy_only=False),
+        index=series.index
+    )
+
+
+def sample_positions(row_count: int) -> Optional[pa.Array]:
+    """
+    Random rows used for first-pass inference (None → use all).
+    """
+    if row_count <= INFERENCE_SAMPLE_SIZE:
+        return None
+
+    rng = np.random.default_rng(0)
+    return pa.array(
+        np.sort(rng.choice(row_count, INFERENCE_SAMPLE_SIZE, replace=False))
+    )
+
+
+def present_cells(values: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Trimmed, non-empty text cells (empty string and null = missing).
+    """
+    trimmed = pc.utf8_trim_whitespace(values)
+    mask = pc.fill_null(pc.not_equal(trimmed, ""), False)
+    return pc.filter(trimmed, mask)
+
+
+def numeric_count(values: pa.ChunkedArray) -> int:
+    mask = pc.match_substring_regex(values, NUMERIC_PATTERN)
+    return pc.sum(pc.fill_null(mask, False)).as_py() or 0
+
+
+def matches_all(present: pa.ChunkedArray, predicate) -> bool:
+    """
+    predicate holds for every present cell. One failing cell in the
+    sample settles it; the full column is only scanned when the
+    whole sample passes.
+    """
+
+    if not len(present):
+        return False
+
+    positions = sample_positions(len(present))
+    sample = present if positions is None else present.take(positions)
+
+    if not predicate(sample):
+        return False
+
+    return positions is None or predicate(present)
+
+
+def is_numeric(values: pa.ChunkedArray) -> bool:
+    return numeric_count(values) == len(values)
+
+
+def is_boolean(values: pa.ChunkedArray) -> bool:
+    tokens = pa.array(list(BOOLEAN_VALUES), type=pa.string())
+    matched = pc.is_in(pc.utf8_lower(values), value_set=tokens)
+    return bool(pc.all(matched).as_py())
+
+
+def is_date(values: pa.ChunkedArray) -> bool:
+    mask = pc.fill_null(pc.match_substring_regex(values, DATE_PATTERN), False)
+
+    if pc.sum(mask).as_py() != len(values):
+        return False
+
+    # Shape matched — make sure the calendar values are real
+    return bool(to_dates(values.to_pandas()).notna().all())
+
+
+KIND_CHECKS = {
+    "number": is_numeric,
+    "boolean": is_boolean,
+    "date": is_date,
+}
+
+
+def all_numeric(present: pa.ChunkedArray) -> bool:
+    return matches_all(present, is_numeric)
+
+
+def text_kinds(
+    present: pa.ChunkedArray,
+    candidates=DETECTED_KINDS
+) -> Dict[str, bool]:
+    """
+    Which detected kinds every present cell matches. Kinds are
+    mutually exclusive on non-empty text, so checking stops at the
+    first match.
+    """
+
+    kinds = {kind: False for kind in candidates}
+
+    for kind in candidates:
+        if matches_all(present, KIND_CHECKS[kind]):
+            kinds[kind] = True
+            break
+
+    return kinds
+
+
+def is_categorical(distinct_count: int, present_count: int) -> bool:
+    return (
+        0 < distinct_count <= CATEGORY_MAX_DISTINCT
+        and distinct_count <= present_count * CATEGORY_MAX_RATIO
+    )
+
+
+def decide_type(
+    kinds: Dict[str, bool],
+    distinct_count: int,
+    present_count: int
+) -> str:
+    for kind in DETECTED_KINDS:
+        if kinds.get(kind):
+            return kind
+
+    if is_categorical(distinct_count, present_count):
+        return "category"
+
+    return "string"
+
+
+def to_numbers(present: pa.ChunkedArray) -> pa.ChunkedArray:
+    try:
+        return pc.cast(present, pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        numbers = pd.to_numeric(present.to_pandas(), errors="coerce")
+        return pa.chunked_array([pa.array(numbers, type=pa.float64(), from_pandas=True)])
+
+
+# =====================================================
+# TYPED CONVERSION (filters / stats)
+# =====================================================
+
+def to_dates(series: pd.Series) -> pd.Series:
+    """
+    Date column → naive datetime64 (offsets normalized to UTC).
+    Invalid and empty cells become NaT.
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        dates = series
+    else:
+        text = trimmed_text(series)
+        text = text.where(text != "")
+
+        try:
+            dates = pd.to_datetime(text, format="ISO8601", errors="coerce")
+        except (ValueError, TypeError):
+            # Mixed UTC offsets
+            dates = pd.to_datetime(text, format="ISO8601", errors="coerce", utc=True)
+
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_convert(None)
+
+    return dates
+
+
+def to_booleans(series: pd.Series) -> pd.Series:
+    """
+    Boolean column → nullable boolean (true/yes/false/no, any case).
+    """
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype("boolean")
+
+    tokens = pc.utf8_lower(trimmed_cells(series))
+    known = pc.is_in(tokens, value_set=pa.array(list(BOOLEAN_VALUES)))
+    truthy = pc.is_in(tokens, value_set=pa.array(
+        [token for token, flag in BOOLEAN_VALUES.items() if flag]
+    ))
+
+    return pd.Series(
+        pd.arrays.BooleanArray(
+            truthy.to_numpy(zero_copy_only=False),
+            pc.invert(known).to_numpy(zero_copy_only=False)
+        ),
+        index=series.index
+    )
+
+
+def parse_date_value(value) -> pd.Timestamp:
+    """
+    Filter value → naive UTC timestamp (raises ValueError).
+    """
+
+    try:
+        stamp = pd.Timestamp(str(value).strip())
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid date '{value}'")
+
+    if pd.isna(stamp):
+        raise ValueError(f"Invalid date '{value}'")
+
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert(None)
+
+    return stamp
+
+
+def parse_boolean_value(value) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    token = str(value).strip().lower()
+
+    if token not in BOOLEAN_VALUES:
+        raise ValueError(f"Invalid boolean '{value}'")
+
+    return BOOLEAN_VALUES[token]
+
+
+def as_json_number(value):
+    if value is None:
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+# =====================================================
+# INFERENCE (THE ONLY TYPING RULE)
+# =====================================================
+
+def histogram(values: np.ndarray) -> Optional[Dict[str, list]]:
+    """
+    Equi-width histogram of finite values (None when they are all
+    equal — min / max already describe that).
+    """
+
+    values = values[np.isfinite(values)]
+
+    if not len(values) or values.min() == values.max():
+        return None
+
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+
+    return {
+        "edges": edges.tolist(),
+        "counts": counts.tolist(),
+    }
+
+
+def profile_column(name: str, values) -> dict:
+    """
+    Type + statistics for one column.
+
+    Rule: the first of number / boolean / date that every non-empty
+    cell matches; otherwise "category" for low-cardinality text and
+    "string" for the rest. Empty cells are missing values.
+    """
+
+    values = as_arrow(values)
+
+    if pa.types.is_dictionary(values.type):
+        # Category storage → profile the text it encodes
+        values = values.cast(pa.string())
+
+    if pa.types.is_integer(values.type) or pa.types.is_floating(values.type):
+        # Already typed (columnar cache)
+        present = pc.drop_null(values)
+        col_type = "number" if len(present) else "string"
+    elif pa.types.is_boolean(values.type):
+        present = pc.drop_null(values)
+        col_type = "boolean" if len(present) else "string"
+    elif pa.types.is_timestamp(values.type) or pa.types.is_date(values.type):
+        present = pc.drop_null(values)
+        col_type = "date" if len(present) else "string"
+    else:
+        present = present_cells(values)
+        col_type = None
+
+    distinct_count = pc.count_distinct(present).as_py() if len(present) else 0
+
+    if col_type is None:
+        col_type = decide_type(text_kinds(present), distinct_count, len(present))
+
+    stats = {
+        "null_count": len(values) - len(present),
+        "distinct_count": distinct_count,
+    }
+
+    if col_type == "number":
+        numbers = to_numbers(present) if pa.types.is_string(present.type) else present
+        bounds = pc.min_max(numbers)
+        stats["min"] = as_json_number(bounds["min"].as_py())
+        stats["max"] = as_json_number(bounds["max"].as_py())
+
+        buckets = histogram(numbers.to_numpy().astype(float))
+        if buckets:
+            stats["histogram"] = buckets
+
+    elif col_type == "date":
+        dates = to_dates(present.to_pandas())
+        stats["min"] = dates.min().isoformat()
+        stats["max"] = dates.max().isoformat()
+
+        # Bucketed on epoch nanoseconds, edges stored as ISO strings
+        epoch_ns = dates.dropna().to_numpy().astype("datetime64[ns]").astype(np.int64)
+        buckets = histogram(epoch_ns.astype(float))
+        if buckets:
+            buckets["edges"] = [
+                pd.Timestamp(int(edge)).isoformat() for edge in buckets["edges"]
+            ]
+            stats["histogram"] = buckets
+
+    elif col_type == "boolean":
+        stats["true_count"] = int(to_booleans(present.to_pandas()).sum())
+
+    elif col_type == "category":
+        counts = pc.value_counts(present)
+        stats["value_counts"] = dict(zip(
+            counts.field("values").to_pylist(),
+            counts.field("counts").to_pylist()
+        ))
+
+    return {
+        "name": name,
+        "type": col_type,
+        "stats": stats
+    }
+
+
+def column_items(data: Union[pd.DataFrame, pa.Table]) -> List[Tuple[str, object]]:
+    if isinstance(data, pd.DataFrame):
+        return [(column, data[column]) for column in data.columns]
+    return list(zip(data.column_names, data.columns))
+
+
+def infer_schema(data: Union[pd.DataFrame, pa.Table]) -> List[dict]:
+    """
+    Typed schema with per-column stats for a DataFrame or Arrow table.
+    """
+    return [profile_column(name, values) for name, values in column_items(data)]
+
+
+def schema_types(schema: List[dict]) -> Dict[str, str]:
+    return {
+        col.get("name"): col.get("type", "string")
+        for col in schema or []
+        if col.get("name")
+    }
+
+
+# =====================================================
+# CACHE (keyed by content checksum)
+# =====================================================
+
+def file_checksum(source) -> str:
+    """
+    SHA-256 of a path or binary file object (same digest as
+    upload_stream, so cache keys match dataset checksums).
+    """
+
+    digest = hashlib.sha256()
+
+    if isinstance(source, str):
+        with open(source, "rb") as handle:
+            for chunk in iter(lambda: handle.read(CHECKSUM_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        source.seek(0)
+
+    return digest.hexdigest()
+
+
+class SchemaCache:
+    """
+    Bounded LRU of inferred schemas keyed by file SHA-256, so the
+    same content is profiled once across validate / preview /
+    test-filter / run.
+    """
+
+    def __init__(self, max_entries: int = SCHEMA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, checksum: str) -> Optional[List[dict]]:
+        if not checksum:
+            return None
+
+        with self.lock:
+            schema = self.entries.get(checksum)
+
+            if schema is not None:
+                self.entries.move_to_end(checksum)
+
+            return schema
+
+    def put(self, checksum: str, schema: List[dict]):
+        if not checksum or not schema:
+            return
+
+        with self.lock:
+            self.entries[checksum] = schema
+            self.entries.move_to_end(checksum)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_infer(
+        self,
+        checksum: str,
+        compute: Callable[[], List[dict]]
+    ) -> List[dict]:
+        schema = self.get(checksum)
+
+        if schema is None:
+            schema = compute()
+            self.put(checksum, schema)
+
+        return schema
+
+
+# Singleton instance
+schema_cache = SchemaCache()
@@ -3,6 +3,8 @@
 import re
 from typing import List, Dict, Tuple
 
+import pandas as pd
+
 
 # =====================================================
 # Custom Exception
@@ -34,6 +36,27 @@ def normalize_key(value: str) -> str:
     )
 
 
+def format_value(value) -> str:
+    """
+    Text for a cell coming from a typed (columnar) dataset.
+    Missing values (None / NaN / NA) render as empty and whole
+    floats render without a trailing ".0".
+    """
+    if value is None:
+        return ""
+
+    try:
+        if pd.isna(value):
+            return ""
+    except (TypeError, ValueError):
+        pass
+
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
 # =====================================================
 # EXTRACT VARIABLES
 # =====================================================
@@ -141,12 +164,7 @@ def render_template(
                 )
             return ""
 
-        value = normalized_row.get(key)
-
-        if value is None:
-            return ""
-
-        return str(value)
+        return format_value(normalized_row.get(key))
 
     try:
         rendered = VARIABLE_PATTERN.sub(replace_match, template)
@@ -0,0 +1,147 @@
+# app/core/upload_stream.py
+
+import io
+import codecs
+import hashlib
+from typing import Dict, Any
+
+from fastapi import UploadFile
+
+from app.core.csv_engine import read_csv_frame, CSVParseError
+from app.core.schema_engine import infer_schema, schema_cache
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024       # 1 MB per read
+SAMPLE_BYTES = 2 * 1024 * 1024        # head of file used for inference
+
+
+# =====================================================
+# STREAM TO DISK
+# =====================================================
+
+async def stream_upload_to_disk(
+    file: UploadFile,
+    destination: str
+) -> Dict[str, Any]:
+    """
+    Copy an upload to disk chunk by chunk while computing, in the
+    same pass:
+        - SHA-256 checksum
+        - file size
+        - line count
+        - encoding (utf-8, else latin1)
+        - head sample for schema inference
+
+    Memory stays bounded by UPLOAD_CHUNK_SIZE + SAMPLE_BYTES
+    regardless of file size.
+    """
+
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    file_size = 0
+    line_count = 0
+    is_utf8 = True
+    last_byte = b""
+    sample = bytearray()
+
+    with open(destination, "wb") as out:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+
+            if not chunk:
+                break
+
+            out.write(chunk)
+            digest.update(chunk)
+
+            file_size += len(chunk)
+            line_count += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+
+            if len(sample) < SAMPLE_BYTES:
+                sample.extend(chunk[:SAMPLE_BYTES - len(sample)])
+
+            if is_utf8:
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    is_utf8 = False
+
+    if is_utf8:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            is_utf8 = False
+
+    # Last line without trailing newline still counts
+    if file_size and last_byte != b"\n":
+        line_count += 1
+
+    return {
+        "checksum": digest.hexdigest(),
+        "file_size": file_size,
+        "encoding": "utf-8" if is_utf8 else "latin1",
+        "line_count": line_count,
+        "sample": bytes(sample),
+        "is_complete_sample": file_size <= SAMPLE_BYTES,
+    }
+
+
+# =====================================================
+# SAMPLE PROFILING
+# =====================================================
+
+def profile_sample(upload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Infer schema + preview rows from the streamed head sample.
+
+    For files larger than the sample, the partial last line is
+    dropped and row_count is estimated from the line count; the
+    background cache build confirms both.
+    """
+
+    sample = upload["sample"]
+    complete = upload["is_complete_sample"]
+
+    if not complete:
+        # Drop the partial last line; if the cut lands inside a
+        # quoted field, back off to an earlier line break
+        attempts = 3
+        end = sample.rfind(b"\n")
+
+        while True:
+            try:
+                df = read_csv_frame(io.BytesIO(sample[:end + 1]))
+                break
+            except CSVParseError:
+                attempts -= 1
+                end = sample.rfind(b"\n", 0, end)
+
+                if attempts == 0 or end <= 0:
+                    raise
+    else:
+        df = read_csv_frame(io.BytesIO(sample))
+
+    if complete:
+        row_count = len(df)
+    else:
+        # Header line excluded
+        row_count = max(upload["line_count"] - 1, len(df))
+
+    schema = infer_schema(df)
+
+    if complete:
+        # Exact for the whole file → reusable by every later path
+        schema_cache.put(upload["checksum"], schema)
+
+    return {
+        "schema": schema,
+        "row_count": row_count,
+        "row_count_estimated": not complete,
+        "dataframe": df,
+    }
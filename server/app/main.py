@@ -9,6 +9,8 @@ from fastapi.responses import JSONResponse
 
 from app.database import engine
 from app.models import db_models
+from app.models.schema_upgrades import apply_schema_upgrades
+from app.core.log_partitions import ensure_log_partitions, start_log_maintenance
 
 from app.api.dataset_routes import router as dataset_router
 from app.api.campaign_template_routes import router as template_router
@@ -18,6 +20,7 @@ from app.api.analytics_routes import router as analytics_router
 from app.api.integration_routes import router as integration_router
 from app.api import dashboard_routes
 from app.api.ws_routes import router as ws_router
+from app.api.sse_routes import router as sse_router
 
 
 # =====================================================
@@ -63,7 +66,14 @@ def health():
 
 @app.on_event("startup")
 def startup():
-    db_models.Base.metadata.create_all(bind=engine)
+    apply_schema_upgrades(engine, db_models.Base.metadata)
+
+    # Inserts need this month's log partition before any run starts
+    with engine.begin() as conn:
+        ensure_log_partitions(conn)
+
+    # Future partitions, archival + retention (background)
+    start_log_maintenance(engine)
 
 
 # =====================================================
@@ -77,4 +87,5 @@ app.include_router(execution_router)
 app.include_router(analytics_router)
 app.include_router(integration_router)
 app.include_router(dashboard_routes.router)
-app.include_router(ws_router)
\ No newline at end of file
+app.include_router(ws_router)
+app.include_router(sse_router)
\ No newline at end of file
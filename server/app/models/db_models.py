@@ -1,11 +1,13 @@
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
     String,
     Boolean,
     JSON,
     Text,
     DateTime,
+    Date,
     ForeignKey,
     Index,
     UniqueConstraint,
@@ -27,6 +29,10 @@ class Organization(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+
+    # Days archived execution logs are kept (None → server default)
+    log_retention_days = Column(Integer, nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
     users = relationship("User", back_populates="organization", cascade="all, delete")
@@ -82,7 +88,7 @@ class Dataset(Base):
     original_filename = Column(String, nullable=False)
     storage_path = Column(String, nullable=False)
 
-    file_size = Column(Integer)
+    file_size = Column(BigInteger)
     checksum = Column(String)
 
     row_count = Column(Integer)
@@ -98,6 +104,10 @@ class Dataset(Base):
 
     organization = relationship("Organization", back_populates="datasets")
 
+    __table_args__ = (
+        Index("idx_dataset_org_checksum", "organization_id", "checksum"),
+    )
+
 
 # =====================================================
 # CHANNEL INTEGRATION
@@ -192,6 +202,7 @@ class CampaignTemplate(Base):
 
     __table_args__ = (
         Index("idx_template_logical_org", "logical_id", "organization_id"),
+        Index("idx_template_org_logical_version", "organization_id", "logical_id", "version"),
         UniqueConstraint("logical_id", "version", name="uq_template_version"),
     )
 
@@ -220,6 +231,13 @@ class CampaignExecution(Base):
 
     file_path = Column(String, nullable=False)
 
+    # Set when running against a stored dataset (file is never deleted)
+    dataset_id = Column(
+        Integer,
+        ForeignKey("datasets.id", ondelete="SET NULL"),
+        nullable=True
+    )
+
     channel_type = Column(String, nullable=False)
     recipient_column = Column(String, nullable=False)
 
@@ -263,6 +281,7 @@ class CampaignExecution(Base):
     __table_args__ = (
         Index("idx_execution_org_status", "organization_id", "status"),
         Index("idx_execution_created_at", "created_at"),
+        Index("idx_execution_org_created", "organization_id", "created_at", "id"),
     )
 
     @validates("recipient_column")
@@ -277,7 +296,9 @@ class CampaignExecution(Base):
 class ExecutionLog(Base):
     __tablename__ = "execution_logs"
 
-    id = Column(Integer, primary_key=True)
+    # Monthly range partitions on created_at (see core/log_partitions);
+    # the partition key must be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
 
     campaign_execution_id = Column(
         Integer,
@@ -302,7 +323,7 @@ class ExecutionLog(Base):
     is_retried = Column(Boolean, default=False, nullable=False)
 
     sent_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
 
     execution = relationship("CampaignExecution", back_populates="logs")
 
@@ -312,6 +333,49 @@ class ExecutionLog(Base):
             "campaign_execution_id",
             "created_at"
         ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# =====================================================
+# ANALYTICS ROLLUP (Maintained on every log flush)
+# =====================================================
+
+class AnalyticsDailyRollup(Base):
+    __tablename__ = "analytics_daily_rollups"
+
+    id = Column(Integer, primary_key=True)
+
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    day = Column(Date, nullable=False)
+    channel_type = Column(String, nullable=False)
+
+    campaign_template_id = Column(
+        Integer,
+        ForeignKey("campaign_templates.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    total_count = Column(Integer, default=0, nullable=False)
+    delivered_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    retry_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "organization_id",
+            "day",
+            "channel_type",
+            "campaign_template_id",
+            name="uq_rollup_bucket"
+        ),
     )
 
 
@@ -332,7 +396,18 @@ class TempDataset(Base):
     original_filename = Column(String, nullable=False)
     storage_path = Column(String, nullable=False)
 
+    # Upload matched a stored dataset (checksum dedup); its files
+    # belong to that dataset, never to this temp row
+    reused_dataset_id = Column(
+        Integer,
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        nullable=True
+    )
+
     schema = Column(JSON)
     row_count = Column(Integer)
 
+    file_size = Column(BigInteger)
+    checksum = Column(String)
+
     created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
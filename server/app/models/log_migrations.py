@@ -0,0 +1,143 @@
+# app/models/log_migrations.py
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.log_partitions import ensure_log_partitions, is_partitioned
+from app.models.schema_upgrades import SCHEMA_UPGRADE_LOCK_KEY
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# ONE-OFF LOG MIGRATIONS
+# =====================================================
+# Too heavy for worker startup (they rewrite or scan the whole
+# log table), so they run once per deploy as an admin command:
+#
+#     python -m app.models.log_migrations
+#
+# Both steps are idempotent; re-running them is a no-op.
+
+# execution_logs → monthly range partitions on created_at. A
+# pre-existing plain table becomes the history partition
+# (MINVALUE → start of the month after its newest row); new
+# months get their own partitions (core/log_partitions).
+PARTITION_EXECUTION_LOGS = """
+DO $$
+DECLARE
+    boundary TIMESTAMP;
+    id_sequence TEXT;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = 'execution_logs'
+          AND c.relkind = 'r'
+          AND n.nspname = current_schema()
+    ) THEN
+        SELECT date_trunc('month', COALESCE(MAX(created_at), NOW()) + INTERVAL '1 month')
+        INTO boundary FROM execution_logs;
+
+        ALTER TABLE execution_logs RENAME TO execution_logs_legacy;
+        ALTER INDEX IF EXISTS execution_logs_pkey
+            RENAME TO execution_logs_legacy_pkey;
+        ALTER INDEX IF EXISTS idx_logs_execution_created
+            RENAME TO idx_logs_execution_created_legacy;
+        ALTER INDEX IF EXISTS ix_execution_logs_campaign_execution_id
+            RENAME TO ix_execution_logs_campaign_execution_id_legacy;
+        ALTER INDEX IF EXISTS ix_execution_logs_recipient_value
+            RENAME TO ix_execution_logs_recipient_value_legacy;
+        ALTER INDEX IF EXISTS ix_execution_logs_delivery_status
+            RENAME TO ix_execution_logs_delivery_status_legacy;
+
+        CREATE TABLE execution_logs (
+            LIKE execution_logs_legacy INCLUDING DEFAULTS
+        ) PARTITION BY RANGE (created_at);
+
+        -- ids keep coming from the same sequence; the parent owns
+        -- it so dropping the history partition later keeps it
+        id_sequence := pg_get_serial_sequence('execution_logs_legacy', 'id');
+
+        IF id_sequence IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY execution_logs.id', id_sequence);
+        END IF;
+
+        ALTER TABLE execution_logs ADD PRIMARY KEY (id, created_at);
+        ALTER TABLE execution_logs ADD FOREIGN KEY (campaign_execution_id)
+            REFERENCES campaign_executions (id) ON DELETE CASCADE;
+
+        CREATE INDEX idx_logs_execution_created
+            ON execution_logs (campaign_execution_id, created_at);
+        CREATE INDEX ix_execution_logs_campaign_execution_id
+            ON execution_logs (campaign_execution_id);
+        CREATE INDEX ix_execution_logs_recipient_value
+            ON execution_logs (recipient_value);
+        CREATE INDEX ix_execution_logs_delivery_status
+            ON execution_logs (delivery_status);
+
+        EXECUTE format(
+            'ALTER TABLE execution_logs ATTACH PARTITION execution_logs_legacy '
+            'FOR VALUES FROM (MINVALUE) TO (%L)',
+            boundary
+        );
+    END IF;
+END $$;
+"""
+
+# Rollup buckets for logs written before the rollup existed.
+# Guarded per (org, day): a day that already has rollup rows was
+# maintained by the log flush and is left alone, every other day
+# with logs is filled in. Buckets are never counted twice.
+BACKFILL_DAILY_ROLLUPS = """
+INSERT INTO analytics_daily_rollups
+    (organization_id, day, channel_type, campaign_template_id,
+     total_count, delivered_count, failed_count, retry_count, updated_at)
+SELECT e.organization_id, CAST(l.created_at AS DATE), l.channel_type,
+       e.campaign_template_id, COUNT(*),
+       COUNT(*) FILTER (WHERE l.delivery_status = 'delivered'),
+       COUNT(*) FILTER (WHERE l.delivery_status = 'failed'),
+       COALESCE(SUM(l.retry_count), 0), NOW()
+FROM execution_logs l
+JOIN campaign_executions e ON e.id = l.campaign_execution_id
+WHERE NOT EXISTS (
+    SELECT 1 FROM analytics_daily_rollups r
+    WHERE r.organization_id = e.organization_id
+      AND r.day = CAST(l.created_at AS DATE)
+)
+GROUP BY 1, 2, 3, 4
+ON CONFLICT ON CONSTRAINT uq_rollup_bucket DO NOTHING
+"""
+
+
+def migrate_execution_logs(engine: Engine) -> int:
+    """
+    Partition execution_logs (if still a plain table), create its
+    current partitions and backfill the daily rollup. Returns the
+    number of rollup buckets backfilled.
+    """
+
+    with engine.begin() as conn:
+        # Same lock as the startup upgrades — never runs alongside them
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": SCHEMA_UPGRADE_LOCK_KEY}
+        )
+
+        if not is_partitioned(conn):
+            logger.info("Partitioning execution_logs")
+            conn.execute(text(PARTITION_EXECUTION_LOGS))
+
+        ensure_log_partitions(conn)
+
+        return conn.execute(text(BACKFILL_DAILY_ROLLUPS)).rowcount
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Backfilled %s rollup buckets", migrate_execution_logs(engine))
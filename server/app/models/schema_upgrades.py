@@ -0,0 +1,54 @@
+# app/models/schema_upgrades.py
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Engine
+
+
+# =====================================================
+# IDEMPOTENT UPGRADES
+# =====================================================
+# create_all() only creates missing tables — it never adds
+# columns or indexes to tables that already exist. Every
+# statement here must be safe to run on every startup, and
+# cheap: data migrations belong in models/log_migrations.
+
+# Workers starting together run create_all + the upgrades one
+# after another; held until the upgrade transaction ends
+SCHEMA_UPGRADE_LOCK_KEY = 8041206
+
+SCHEMA_UPGRADES = [
+    "ALTER TABLE temp_datasets ADD COLUMN IF NOT EXISTS file_size BIGINT",
+    # Uploads past 2 GB overflow INTEGER (no-op once BIGINT)
+    "ALTER TABLE temp_datasets ALTER COLUMN file_size TYPE BIGINT",
+    "ALTER TABLE datasets ALTER COLUMN file_size TYPE BIGINT",
+    "ALTER TABLE temp_datasets ADD COLUMN IF NOT EXISTS checksum VARCHAR",
+    "ALTER TABLE temp_datasets ADD COLUMN IF NOT EXISTS reused_dataset_id INTEGER "
+    "REFERENCES datasets(id) ON DELETE CASCADE",
+    "CREATE INDEX IF NOT EXISTS idx_dataset_org_checksum ON datasets (organization_id, checksum)",
+    "ALTER TABLE campaign_executions ADD COLUMN IF NOT EXISTS dataset_id INTEGER "
+    "REFERENCES datasets(id) ON DELETE SET NULL",
+    "CREATE INDEX IF NOT EXISTS idx_execution_org_created "
+    "ON campaign_executions (organization_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_template_org_logical_version "
+    "ON campaign_templates (organization_id, logical_id, version)",
+    "ALTER TABLE organizations ADD COLUMN IF NOT EXISTS log_retention_days INTEGER",
+]
+
+
+def apply_schema_upgrades(engine: Engine, metadata: MetaData):
+    """
+    create_all() and SCHEMA_UPGRADES in one transaction, under the
+    upgrade lock (two workers' create_all would otherwise race on
+    the same CREATE TABLE / CREATE TYPE).
+    """
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": SCHEMA_UPGRADE_LOCK_KEY}
+        )
+
+        metadata.create_all(bind=conn)
+
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))